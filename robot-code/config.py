@@ -7,6 +7,8 @@
 # ──────────────────────────────────────────────────────────────────────────────
 # GPIO — Moteur GAUCHE  (L298N / IBT-2 ou équivalent H-Bridge)
 # ──────────────────────────────────────────────────────────────────────────────
+# Jetson Nano : PWM matériel uniquement sur pin 32 (BCM 12, pwmchip0/pwm0)
+# et pin 33 (BCM 13, pwmchip0/pwm2) — à activer via jetson-io.py
 MOTOR_LEFT_PWM   = 12   # GPIO BCM — signal PWM vitesse (freq 20 kHz recommandée)
 MOTOR_LEFT_IN1   = 23   # GPIO BCM — direction A
 MOTOR_LEFT_IN2   = 24   # GPIO BCM — direction B
@@ -30,6 +32,12 @@ ENCODER_TICKS_PER_REV  = 360   # impulsions par tour de roue
 WHEEL_DIAMETER_MM      = 120   # diamètre roue (mm)
 WHEEL_BASE_MM          = 450   # écartement entre roues (mm)
 
+# Lecture fronts encodeurs via libgpiod v2 (si disponible) :
+# offsets de ligne sur le gpiochip Tegra (≠ numéros BCM de Jetson.GPIO)
+ENCODER_GPIOCHIP       = "/dev/gpiochip0"
+ENCODER_LEFT_A_LINE    = 149   # pin 29 (BCM 5)
+ENCODER_RIGHT_A_LINE   = 51    # pin 36 (BCM 16)
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Capteurs ultrasons (HC-SR04 ou similaire)
 # ──────────────────────────────────────────────────────────────────────────────
@@ -40,8 +48,19 @@ US_REAR_ECHO     = 25   # GPIO BCM
 US_LEFT_TRIG     = 19   # GPIO BCM
 US_LEFT_ECHO     = 26   # GPIO BCM
 
+# Lecture ECHO horodatée noyau via libgpiod v2 (si disponible) :
+# offsets de ligne sur le gpiochip Tegra (≠ numéros BCM de Jetson.GPIO)
+US_GPIOCHIP             = "/dev/gpiochip0"
+US_FRONT_ECHO_LINE      = 216  # pin 7  (BCM 4)
+US_REAR_ECHO_LINE       = 13   # pin 22 (BCM 25)
+US_LEFT_ECHO_LINE       = 12   # pin 37 (BCM 26)
+# Repli sans uAPI v2 : fronts via /sys/class/gpio/gpioN/{edge,value}
+# (N = base du gpiochip + offset ; base 0 pour gpiochip0 sur Jetson Nano)
+US_SYSFS_GPIO_BASE      = 0
+
 US_MIN_DISTANCE_CM      = 15   # distance obstacle → arrêt automatique
 US_WARNING_DISTANCE_CM  = 40   # distance → ralentissement automatique
+US_MAX_READING_AGE_S    = 0.3  # lecture plus ancienne → voie considérée non libre
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Bouton arrêt d'urgence PHYSIQUE (NO — normalement ouvert)
@@ -52,6 +71,7 @@ ESTOP_PIN        = 21   # GPIO BCM — actif bas (pull-up interne)
 # Batterie — INA219 sur bus I2C (courant, tension, puissance)
 # ──────────────────────────────────────────────────────────────────────────────
 BATTERY_I2C_ADDR        = 0x40  # adresse INA219 par défaut
+BATTERY_I2C_BUS         = 1     # /dev/i2c-1 (pins 3/5 du header Jetson Nano)
 BATTERY_SHUNT_OHM       = 0.1   # valeur shunt (ohm)
 BATTERY_MAX_EXPECTED_A  = 5.0   # courant max attendu (A)
 BATTERY_NOMINAL_V       = 24.0  # tension nominale pack batterie (V)
@@ -74,6 +94,21 @@ CAMERA_FRAMERATE        = 30            # fps (50 fps à 5 km/h recommandé)
 CAMERA_ROTATION         = 180           # rotation si montage inversé (0/90/180/270)
 CAMERA_INDEX            = 0             # index si USB camera (OpenCV)
 USE_PICAMERA2           = False         # Jetson Nano : False (OpenCV + GStreamer CSI)
+CAMERA_HW_JPEG          = True          # CSI : encodage JPEG matériel NVJPG (nvjpegenc)
+CAMERA_IDLE_FPS         = 2             # fps publiés sans client du flux (OpenCV)
+CAMERA_JPEG_QUALITY_INSPECTION = 90     # qualité JPEG pendant l'inspection (détail)
+CAMERA_JPEG_QUALITY_IDLE       = 70     # qualité JPEG hors inspection (débit réduit)
+
+# Affinité CPU (Jetson Nano : 4 cœurs A57) — None = pas d'épinglage
+CAMERA_CPU_AFFINITY     = {0}           # thread capture (l'encodage JPEG tourne sur les cœurs principaux)
+MAIN_CPU_AFFINITY       = {1, 2, 3}     # boucle asyncio, capteurs, sécurité
+
+# Priorité SCHED_FIFO (1…99, 0 = ordonnancement par défaut) — requiert root
+# ou CAP_SYS_NICE ; à défaut, niceness -5
+CAMERA_RT_PRIORITY      = 20            # thread capture caméra
+RAMP_RT_PRIORITY        = 30            # thread rampe moteurs (échéances 30 ms)
+US_RT_PRIORITY          = 50            # threads ultrasons (chronométrage ECHO)
+US_CPU_AFFINITY         = {3}           # threads ultrasons (isolcpus=3 conseillé)
 
 # Éclairage LED sous-caisse  (PWM sur transistor MOSFET)
 LED_LIGHTING_PWM_PIN    = 9    # GPIO BCM
@@ -104,9 +139,13 @@ HTTP_PORT           = 8080          # port HTTP REST + MJPEG stream
 STREAM_PATH         = "/stream"     # endpoint MJPEG
 API_BASE_PATH       = "/api"        # base URL REST
 
+TCP_SOCKET_BUFFER_BYTES = 4 * 1024 * 1024  # SO_SNDBUF / SO_RCVBUF (borné par net.core.*mem_max)
+
 MAX_WS_CLIENTS      = 5             # connexions simultanées max
 WS_PING_INTERVAL    = 10            # secondes — keepalive WebSocket
-TELEMETRY_INTERVAL  = 0.2           # secondes — fréquence envoi télémétrie (5 Hz)
+TELEMETRY_INTERVAL  = 0.2           # secondes — fréquence échantillonnage télémétrie (5 Hz)
+TELEMETRY_BATCH_MAX = 5             # échantillons max regroupés par trame WebSocket
+TELEMETRY_FLUSH_INTERVAL = 0.2      # secondes — délai max avant envoi d'un lot (latence e-stop/obstacle côté opérateur)
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Journalisation et données
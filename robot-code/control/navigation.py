@@ -6,13 +6,15 @@
 
 import asyncio
 import logging
+import os
 import time
-from enum import Enum, auto
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum, auto
 
 logger = logging.getLogger("siana.navigation")
 
 
-class RobotState(Enum):
+class RobotState(IntEnum):
     IDLE           = auto()   # robot arrêté, en attente
     MOVING_FORWARD = auto()   # avance
     MOVING_BACKWARD= auto()   # recule
@@ -25,6 +27,10 @@ class RobotState(Enum):
     FAULT          = auto()   # défaut système
 
 
+# Noms d'état précalculés, indexés par valeur (auto() → 1…N)
+STATE_NAME = ("",) + tuple(s.name for s in RobotState)
+
+
 # Commandes textuelles acceptées via WebSocket / REST
 VALID_COMMANDS = {
     # Mouvement
@@ -58,7 +64,28 @@ VALID_COMMANDS = {
     "reset_odometry",
 }
 
+# Commandes acceptées pendant un arrêt d'urgence verrouillé
+_ESTOP_ALLOWED = frozenset(("estop_release", "ping"))
+
 SPEED_STEP = 10   # % de change par commande speed_up / speed_down
+SPEED_MIN  = 20.0
+SPEED_MAX  = 100.0
+
+
+def _parse_pct(cmd: dict, default: float, lo: float, hi: float):
+    """
+    Lit le paramètre "value" d'une commande et le borne à [lo, hi].
+    Retourne None si la valeur n'est pas numérique (ou NaN).
+    """
+    v = cmd.get("value", default)
+    if type(v) is not float:
+        try:
+            v = float(v)
+        except (TypeError, ValueError):
+            return None
+    if v != v:   # NaN
+        return None
+    return lo if v < lo else hi if v > hi else v
 
 
 class NavigationController:
@@ -86,6 +113,26 @@ class NavigationController:
         self._inspecting = False
         self._start_time = None
 
+        # Écritures disque des snapshots hors boucle asyncio (sérialisées)
+        self._snapshot_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="siana-snapshot"
+        )
+
+        # Répertoire des preuves : créé une fois au démarrage
+        import config as cfg
+        self._evidence_dir = cfg.EVIDENCE_DIR
+        try:
+            os.makedirs(self._evidence_dir, exist_ok=True)
+        except OSError as e:
+            logger.error("Répertoire preuves inaccessible (%s) : %s", self._evidence_dir, e)
+
+        # Table de dispatch résolue une fois : action → méthode _cmd_*
+        self._handlers = {}
+        for name in VALID_COMMANDS:
+            handler = getattr(self, f"_cmd_{name}", None)
+            if callable(handler):
+                self._handlers[name] = handler
+
         self._leds.set_state("ready")
         logger.info("NavigationController prêt")
 
@@ -99,18 +146,15 @@ class NavigationController:
         """
         action = cmd.get("action", "").lower().strip()
 
-        if action not in VALID_COMMANDS:
+        handler = self._handlers.get(action)
+        if handler is None:
             return self._resp(False, f"Commande inconnue : '{action}'")
 
         # L'arrêt d'urgence bloque tout sauf estop_release et ping
-        if self._state == RobotState.EMERGENCY_STOP and action not in ("estop_release", "ping"):
+        if self._state is RobotState.EMERGENCY_STOP and action not in _ESTOP_ALLOWED:
             return self._resp(False, "ARRÊT D'URGENCE actif — seule la commande estop_release est acceptée")
 
-        handler = getattr(self, f"_cmd_{action}", None)
-        if callable(handler):
-            return await handler(cmd)
-
-        return self._resp(False, f"Commande non implémentée : {action}")
+        return await handler(cmd)
 
     # ── Commandes mouvement ───────────────────────────────────────────────────
 
@@ -169,18 +213,20 @@ class NavigationController:
     # ── Vitesse ───────────────────────────────────────────────────────────────
 
     async def _cmd_speed_up(self, cmd):
-        self._speed_pct = min(100.0, self._speed_pct + SPEED_STEP)
+        self._speed_pct = min(SPEED_MAX, self._speed_pct + SPEED_STEP)
         self._motors.set_speed_pct(self._speed_pct)
         return self._resp(True, f"Vitesse : {self._speed_pct:.0f}%")
 
     async def _cmd_speed_down(self, cmd):
-        self._speed_pct = max(20.0, self._speed_pct - SPEED_STEP)
+        self._speed_pct = max(SPEED_MIN, self._speed_pct - SPEED_STEP)
         self._motors.set_speed_pct(self._speed_pct)
         return self._resp(True, f"Vitesse : {self._speed_pct:.0f}%")
 
     async def _cmd_set_speed(self, cmd):
-        v = float(cmd.get("value", self._speed_pct))
-        self._speed_pct = max(20.0, min(100.0, v))
+        v = _parse_pct(cmd, self._speed_pct, SPEED_MIN, SPEED_MAX)
+        if v is None:
+            return self._resp(False, "Valeur de vitesse invalide")
+        self._speed_pct = v
         self._motors.set_speed_pct(self._speed_pct)
         return self._resp(True, f"Vitesse réglée : {self._speed_pct:.0f}%")
 
@@ -191,7 +237,7 @@ class NavigationController:
         self._start_time = time.time()
         self._motors.reset_odometry()
         self._leds.lighting_on()
-        self._camera.update_overlay(0.0, "INSPECTION EN COURS")
+        self._camera.update_overlay(0.0, "INSPECTION EN COURS", inspecting=True)
         self._leds.set_state("ready")
         logger.info("Inspection démarrée")
         return self._resp(True, "Inspection démarrée")
@@ -200,7 +246,7 @@ class NavigationController:
         self._inspecting = False
         self._motors.stop()
         self._leds.lighting_off()
-        self._camera.update_overlay(self._motors.distance_m, "INSPECTION TERMINÉE")
+        self._camera.update_overlay(self._motors.distance_m, "INSPECTION TERMINÉE", inspecting=False)
         self._leds.set_state("ready")
         logger.info("Inspection terminée — %.1f m parcourus", self._motors.distance_m)
         return self._resp(True, f"Inspection terminée — {self._motors.distance_m:.1f} m")
@@ -243,18 +289,19 @@ class NavigationController:
         return self._resp(True, "Éclairage OFF")
 
     async def _cmd_light_set(self, cmd):
-        v = float(cmd.get("value", 80))
+        v = _parse_pct(cmd, 80.0, 0.0, 100.0)
+        if v is None:
+            return self._resp(False, "Valeur d'éclairage invalide")
         self._leds.set_lighting(v)
         return self._resp(True, f"Éclairage : {v:.0f}%")
 
     async def _cmd_snapshot(self, cmd):
-        import os
-        import config as cfg
-        os.makedirs(cfg.EVIDENCE_DIR, exist_ok=True)
         ts  = time.strftime("%Y%m%d_%H%M%S")
         pos = f"{self._motors.distance_m:.2f}m".replace(".", "p")
-        fp  = os.path.join(cfg.EVIDENCE_DIR, f"evidence_{ts}_{pos}.jpg")
-        ok  = self._camera.save_snapshot(fp)
+        fp  = os.path.join(self._evidence_dir, f"evidence_{ts}_{pos}.jpg")
+        ok  = await asyncio.get_running_loop().run_in_executor(
+            self._snapshot_executor, self._camera.save_snapshot, fp
+        )
         if ok:
             return self._resp(True, f"Snapshot sauvegardé : {fp}", {"filepath": fp})
         return self._resp(False, "Snapshot échoué — caméra non disponible")
@@ -276,19 +323,28 @@ class NavigationController:
         self._state = state
 
     def _resp(self, ok: bool, msg: str, extra: dict = None) -> dict:
-        r = {
+        # Un seul dict construit, extra fusionné dans le littéral
+        if extra:
+            return {
+                "ok":    ok,
+                "msg":   msg,
+                "state": STATE_NAME[self._state],
+                "speed": self._speed_pct,
+                **extra,
+            }
+        return {
             "ok":    ok,
             "msg":   msg,
-            "state": self._state.name,
+            "state": STATE_NAME[self._state],
             "speed": self._speed_pct,
         }
-        if extra:
-            r.update(extra)
-        return r
+
+    def shutdown(self):
+        self._snapshot_executor.shutdown(wait=False)
 
     def get_status(self) -> dict:
         return {
-            "state":       self._state.name,
+            "state":       STATE_NAME[self._state],
             "speed_pct":   self._speed_pct,
             "inspecting":  self._inspecting,
             "distance_m":  self._motors.distance_m,
@@ -5,17 +5,35 @@
 # =============================================================================
 
 import asyncio
-import threading
+import os
 import time
 import logging
 
+from control.navigation import RobotState
+
 logger = logging.getLogger("siana.safety")
 
-try:
-    import Jetson.GPIO as GPIO
-    _GPIO_AVAILABLE = True
-except (ImportError, RuntimeError):
-    _GPIO_AVAILABLE = False
+# Capteur → état de mouvement rendu dangereux par un obstacle critique
+_CRITICAL_DIR = {
+    "front": RobotState.MOVING_FORWARD,
+    "rear":  RobotState.MOVING_BACKWARD,
+}
+_MOVING_STRAIGHT = frozenset((RobotState.MOVING_FORWARD, RobotState.MOVING_BACKWARD))
+
+# Jetson.GPIO importé à la demande (seul le bouton E-STOP en a besoin)
+GPIO = None
+
+
+def _ensure_gpio() -> bool:
+    """Importe Jetson.GPIO au premier appel. True si disponible."""
+    global GPIO
+    if GPIO is None:
+        try:
+            import Jetson.GPIO as _gpio
+        except (ImportError, RuntimeError):
+            return False
+        GPIO = _gpio
+    return True
 
 
 class SafetyManager:
@@ -49,8 +67,10 @@ class SafetyManager:
         self._nav     = navigation
 
         self._estop_active   = False
-        self._last_command_t = time.time()
-        self._watchdog_active = True
+        self._last_command_t = time.monotonic()   # horloge monotone (insensible NTP)
+        self._loop           = asyncio.get_running_loop()   # construit depuis la boucle (main)
+        self._wd_handle      = None   # asyncio.TimerHandle du watchdog
+        self._estop_fd       = None   # eventfd interruption GPIO → boucle asyncio
 
         # Enregistrement des callbacks capteurs
         self._obstacle_mgr.on_critical(self._on_obstacle_critical)
@@ -60,11 +80,8 @@ class SafetyManager:
         # Bouton physique E-STOP
         self._setup_estop_gpio()
 
-        # Watchdog connexion
-        self._watchdog_thread = threading.Thread(
-            target=self._watchdog_loop, daemon=True
-        )
-        self._watchdog_thread.start()
+        # Watchdog connexion (timer boucle asyncio, réarmé à chaque heartbeat)
+        self._arm_watchdog()
 
         logger.info("SafetyManager initialisé")
 
@@ -72,9 +89,14 @@ class SafetyManager:
 
     def _setup_estop_gpio(self):
         import config as cfg
-        if not _GPIO_AVAILABLE:
+        if not _ensure_gpio():
             logger.warning("GPIO non disponible — bouton E-STOP matériel désactivé")
             return
+        # L'ISR GPIO (thread Jetson.GPIO) ne fait que réveiller la boucle
+        # asyncio via un eventfd ; la logique E-STOP s'exécute sur la boucle.
+        if hasattr(os, "eventfd"):
+            self._estop_fd = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+            self._loop.add_reader(self._estop_fd, self._handle_estop_edge)
         GPIO.setup(cfg.ESTOP_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
         GPIO.add_event_detect(
             cfg.ESTOP_PIN,
@@ -85,7 +107,24 @@ class SafetyManager:
         logger.info("Bouton E-STOP configuré sur GPIO%d", cfg.ESTOP_PIN)
 
     def _on_estop_gpio(self, _channel):
-        """Interrupt GPIO — exécuté immédiatement lors du pressage bouton."""
+        """
+        Interrupt GPIO — exécuté immédiatement lors du pressage bouton.
+        Les moteurs sont coupés sans attendre la boucle asyncio ; le reste
+        (LEDs, état navigation) est traité par _handle_estop_edge.
+        """
+        self._motors.emergency_stop()
+        if self._estop_fd is not None:
+            os.eventfd_write(self._estop_fd, 1)
+        else:
+            self._loop.call_soon_threadsafe(self._handle_estop_edge)
+
+    def _handle_estop_edge(self):
+        """Traitement E-STOP physique sur la boucle asyncio."""
+        if self._estop_fd is not None:
+            try:
+                os.eventfd_read(self._estop_fd)
+            except BlockingIOError:
+                return
         logger.critical("BOUTON E-STOP PHYSIQUE PRESSÉ")
         self.trigger_emergency("Bouton E-STOP physique")
 
@@ -94,12 +133,9 @@ class SafetyManager:
     def _on_obstacle_critical(self, sensor_name: str, dist_cm: float):
         logger.critical("Obstacle critique [%s] : %.1f cm", sensor_name, dist_cm)
         # Arrêt uniquement si le robot se déplace dans la direction concernée
-        from control.navigation import RobotState
         if self._nav:
-            state = self._nav._state
-            moving_forward  = state == RobotState.MOVING_FORWARD  and sensor_name == "front"
-            moving_backward = state == RobotState.MOVING_BACKWARD and sensor_name == "rear"
-            if moving_forward or moving_backward:
+            danger = _CRITICAL_DIR.get(sensor_name)
+            if danger is not None and self._nav._state is danger:
                 self.trigger_emergency(f"Obstacle critique [{sensor_name}] : {dist_cm:.0f} cm")
         else:
             self._motors.brake()
@@ -108,10 +144,7 @@ class SafetyManager:
         logger.warning("Obstacle proche [%s] : %.1f cm — ralentissement", sensor_name, dist_cm)
         self._leds.set_state("warning")
         # Réduction vitesse automatique
-        from control.navigation import RobotState
-        if self._nav and self._nav._state in (
-            RobotState.MOVING_FORWARD, RobotState.MOVING_BACKWARD
-        ):
+        if self._nav and self._nav._state in _MOVING_STRAIGHT:
             new_speed = max(20.0, self._nav._speed_pct * 0.5)
             self._motors.set_speed_pct(new_speed)
 
@@ -126,29 +159,37 @@ class SafetyManager:
 
     # ── Watchdog connexion ────────────────────────────────────────────────────
 
-    def _watchdog_loop(self):
+    def _arm_watchdog(self):
+        """(Ré)arme le timer watchdog — doit s'exécuter sur la boucle asyncio."""
+        if self._wd_handle is not None:
+            self._wd_handle.cancel()
+        self._wd_handle = self._loop.call_later(
+            self.WATCHDOG_TIMEOUT_S, self._on_watchdog_expire
+        )
+
+    def _on_watchdog_expire(self):
         """
-        Si aucune commande reçue depuis WATCHDOG_TIMEOUT_S secondes,
+        Aucune commande reçue depuis WATCHDOG_TIMEOUT_S secondes :
         le robot s'arrête automatiquement (sécurité perte signal WiFi).
+        Le timer n'est réarmé qu'à la prochaine commande.
         """
-        while self._watchdog_active:
-            time.sleep(2.0)
-            if not self._estop_active:
-                elapsed = time.time() - self._last_command_t
-                if elapsed > self.WATCHDOG_TIMEOUT_S:
-                    logger.warning(
-                        "Watchdog : aucune commande depuis %.0fs — arrêt sécurité",
-                        elapsed
-                    )
-                    self._motors.stop()
-                    if self._nav:
-                        from control.navigation import RobotState
-                        self._nav._state = RobotState.IDLE
-                    self._leds.set_state("warning")
+        self._wd_handle = None
+        if self._estop_active:
+            return
+        elapsed = time.monotonic() - self._last_command_t
+        logger.warning(
+            "Watchdog : aucune commande depuis %.0fs — arrêt sécurité",
+            elapsed
+        )
+        self._motors.stop()
+        if self._nav:
+            self._nav._state = RobotState.IDLE
+        self._leds.set_state("warning")
 
     def heartbeat(self):
         """Appelé à chaque réception de commande ou heartbeat WebSocket."""
-        self._last_command_t = time.time()
+        self._last_command_t = time.monotonic()
+        self._arm_watchdog()
 
     # ── Limite de fosse ───────────────────────────────────────────────────────
 
@@ -185,7 +226,6 @@ class SafetyManager:
 
         # 3. Mettre à jour l'état navigation
         if self._nav:
-            from control.navigation import RobotState
             self._nav._state = RobotState.EMERGENCY_STOP
 
     def release_emergency(self, reason: str = ""):
@@ -200,9 +240,8 @@ class SafetyManager:
         self._motors.release_emergency()
         self._leds.set_state("ready")
         if self._nav:
-            from control.navigation import RobotState
             self._nav._state = RobotState.IDLE
-        self._last_command_t = time.time()   # reset watchdog
+        self.heartbeat()   # reset watchdog
 
     @property
     def is_emergency(self) -> bool:
@@ -217,12 +256,19 @@ class SafetyManager:
         self._nav = nav
 
     def get_telemetry(self) -> dict:
+        ago = time.monotonic() - self._last_command_t
         return {
             "estop":           self._estop_active,
-            "watchdog_ok":     (time.time() - self._last_command_t) < self.WATCHDOG_TIMEOUT_S,
-            "last_cmd_ago_s":  round(time.time() - self._last_command_t, 1),
+            "watchdog_ok":     ago < self.WATCHDOG_TIMEOUT_S,
+            "last_cmd_ago_s":  round(ago, 1),
             "obstacles":       self._obstacle_mgr.get_readings(),
         }
 
     def shutdown(self):
-        self._watchdog_active = False
+        if self._wd_handle is not None:
+            self._wd_handle.cancel()
+            self._wd_handle = None
+        if self._estop_fd is not None:
+            self._loop.remove_reader(self._estop_fd)
+            os.close(self._estop_fd)
+            self._estop_fd = None
@@ -5,10 +5,15 @@
 # =============================================================================
 
 import io
+import math
+import contextlib
+import itertools
+import queue
 import time
 import threading
 import logging
-import datetime
+
+from hardware.sched import pin_thread, raise_thread_priority
 
 logger = logging.getLogger("siana.camera")
 
@@ -20,10 +25,32 @@ try:
     import cv2
     import numpy as np
     _CV2_AVAILABLE = True
+    # Sommets d'un boulon hexagonal (rayon 8 px), arrondis une fois pour toutes
+    _HEX_OFFSETS = np.rint(
+        8 * np.array([(math.cos(math.radians(a)), math.sin(math.radians(a)))
+                      for a in range(0, 360, 60)])
+    ).astype(np.int32)
 except ImportError:
     _CV2_AVAILABLE = False
     logger.warning("OpenCV (cv2) non disponible")
 
+# GStreamer natif (PyGObject) : récupère directement les JPEG de nvjpegenc
+try:
+    import gi
+    gi.require_version("Gst", "1.0")
+    from gi.repository import Gst
+    _GST_AVAILABLE = True
+except (ImportError, ValueError):
+    _GST_AVAILABLE = False
+
+# libjpeg-turbo (NEON) : encodage JPEG plus rapide que cv2.imencode
+# sudo apt install libturbojpeg && pip install PyTurboJPEG
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420, TJFLAG_FASTDCT
+    _TURBOJPEG_AVAILABLE = True
+except ImportError:
+    _TURBOJPEG_AVAILABLE = False
+
 
 class CameraStream:
     """
@@ -36,12 +63,16 @@ class CameraStream:
     """
 
     # Délimiteurs MJPEG
-    MJPEG_BOUNDARY = b"--frame"
-    MJPEG_HEADER   = (
+    # En-tête de partie découpé : seul Content-Length varie, le JPEG est
+    # émis comme un morceau séparé (pas de concaténation de la charge utile)
+    MJPEG_BOUNDARY      = b"--frame"
+    MJPEG_HEADER_PREFIX = (
         b"--frame\r\n"
         b"Content-Type: image/jpeg\r\n"
-        b"Content-Length: %d\r\n\r\n"
+        b"Content-Length: "
     )
+    MJPEG_HEADER_SUFFIX = b"\r\n\r\n"
+    MJPEG_PART_END      = b"\r\n"
 
     def __init__(self):
         import config as cfg
@@ -50,16 +81,45 @@ class CameraStream:
         self._fps     = cfg.CAMERA_FRAMERATE
         self._rotation = cfg.CAMERA_ROTATION
 
-        self._frame_lock   = threading.Lock()
-        self._latest_jpeg  = None
-        self._frame_count  = 0
+        # Dernière image publiée par échange atomique de référence (sans verrou) :
+        # (n° de séquence, JPEG ou None, (image BGR, qualité) à encoder ou None)
+        self._latest       = (0, None, None)
+        self._seq          = itertools.count(1)
+        self._jpeg_cache   = (0, None)   # (n° de séquence, JPEG encodé à la demande)
+        self._part_cache   = (0, None)   # (n° de séquence, en-tête de partie MJPEG)
+        # Condition : sert uniquement à réveiller les générateurs MJPEG bloquants
+        self._frame_cond   = threading.Condition()
+        # Callbacks sans argument appelés (thread producteur) à chaque image
+        self._frame_listeners = []
+        # Clients du flux MJPEG : sans client, l'encodage est différé
+        self._consumers      = 0
+        self._consumers_lock = threading.Lock()
+        # Encodage découplé de la capture : file 1 place, la plus récente gagne
+        self._raw_q          = queue.Queue(maxsize=1)
+        self._encoder_thread = None
         self._running      = False
         self._thread       = None
         self._capture      = None  # handle caméra
 
+        # Encodeur JPEG : libjpeg-turbo si disponible, sinon cv2.imencode
+        self._tj = None
+        if _TURBOJPEG_AVAILABLE:
+            try:
+                self._tj = TurboJPEG()
+            except (OSError, RuntimeError) as e:
+                logger.warning("libturbojpeg introuvable (%s) — cv2.imencode", e)
+
         # Overlay : affichage horodatage + position sur l'image
         self._overlay_pos_m  = 0.0
         self._overlay_status = "INSPECTION"
+        self._ts_cache = ("", -1)   # (horodatage formaté, seconde epoch)
+        # Éléments GStreamer textoverlay (pipeline NVJPG) : statut / position
+        self._status_el = None
+        self._pos_el    = None
+        self._jpegenc_el = None
+
+        # Qualité JPEG selon l'activité : détail en inspection, débit réduit sinon
+        self._jpeg_quality = cfg.CAMERA_JPEG_QUALITY_IDLE
 
     # ── Démarrage ─────────────────────────────────────────────────────────────
 
@@ -68,7 +128,10 @@ class CameraStream:
             return
         self._running = True
 
-        if _CV2_AVAILABLE and self.cfg.USE_PICAMERA2 is False:
+        if _GST_AVAILABLE and self.cfg.CAMERA_HW_JPEG:
+            # JPEG encodé par le NVJPG ; repli OpenCV si pipeline indisponible
+            self._thread = threading.Thread(target=self._capture_hw_jpeg, daemon=True)
+        elif _CV2_AVAILABLE and self.cfg.USE_PICAMERA2 is False:
             # Vérifier si caméra CSI Jetson disponible (nvarguscamerasrc)
             self._thread = threading.Thread(target=self._capture_opencv, daemon=True)
         elif _CV2_AVAILABLE:
@@ -78,12 +141,21 @@ class CameraStream:
             self._thread = threading.Thread(target=self._capture_synthetic, daemon=True)
 
         self._thread.start()
+        # Créé depuis le thread appelant : hérite de son affinité CPU et de
+        # son ordonnancement, pas de ceux (épinglés) du thread de capture
+        self._encoder_thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self._encoder_thread.start()
         logger.info("CameraStream démarré (%dx%d @ %dfps)", self._width, self._height, self._fps)
 
     def stop(self):
         self._running = False
+        with self._frame_cond:
+            self._frame_cond.notify_all()   # réveille les générateurs MJPEG
         if self._thread:
             self._thread.join(timeout=3.0)
+        if self._encoder_thread:
+            self._encoder_thread.join(timeout=1.0)
+            self._encoder_thread = None
         if self._capture and _CV2_AVAILABLE:
             self._capture.release()
             self._capture = None
@@ -101,9 +173,84 @@ class CameraStream:
         "videoconvert ! video/x-raw, format=BGR ! appsink max-buffers=1 drop=true"
     )
 
+    # Variante encodage matériel : l'overlay est rendu par GStreamer
+    # (textoverlay + clockoverlay) et nvjpegenc livre des JPEG à l'appsink,
+    # sans aucune image brute ni encodage côté Python.
+    # flip-method : 0 = aucune, 2 = 180°, 3 = 90° horaire
+    GSTREAMER_JPEG_PIPELINE = (
+        "nvarguscamerasrc sensor-id=0 ! "
+        "video/x-raw(memory:NVMM), width={w}, height={h}, framerate={fps}/1 ! "
+        "nvvidconv flip-method={flip} ! video/x-raw, format=I420 ! "
+        "textoverlay name=status_ov valignment=top halignment=left "
+        "font-desc=\"Sans 14\" shaded-background=true ! "
+        "textoverlay name=pos_ov valignment=top halignment=center "
+        "font-desc=\"Sans 14\" color=0xFFFFC850 ! "
+        "clockoverlay valignment=top halignment=right "
+        "time-format=\"%Y-%m-%d %H:%M:%S\" font-desc=\"Sans 12\" ! "
+        "nvjpegenc name=jpegenc quality={quality} ! image/jpeg ! "
+        "appsink name=sink max-buffers=1 drop=true sync=false"
+    )
+    _FLIP_METHOD = {0: 0, 90: 3, 180: 2, 270: 1}
+
+    def _pin_capture_thread(self):
+        """
+        Épingle le thread de capture (appelant) sur CAMERA_CPU_AFFINITY
+        et l'élève en SCHED_FIFO (CAMERA_RT_PRIORITY).
+        """
+        raise_thread_priority(self.cfg.CAMERA_RT_PRIORITY, "caméra")
+        pin_thread(getattr(self.cfg, "CAMERA_CPU_AFFINITY", None), "caméra")
+
+    # ── Capture CSI avec encodage JPEG matériel (NVJPG) ────────────────────────
+
+    def _capture_hw_jpeg(self):
+        self._pin_capture_thread()
+        Gst.init(None)
+        desc = self.GSTREAMER_JPEG_PIPELINE.format(
+            w=self._width, h=self._height, fps=self._fps,
+            flip=self._FLIP_METHOD.get(self._rotation, 0),
+            quality=self._jpeg_quality,
+        )
+        try:
+            pipeline = Gst.parse_launch(desc)
+        except Exception as e:
+            logger.warning("Pipeline NVJPG indisponible (%s) — fallback OpenCV", e)
+            pipeline = None
+        if pipeline is not None:
+            pipeline.set_state(Gst.State.PLAYING)
+            ret, _state, _pending = pipeline.get_state(5 * Gst.SECOND)
+            if ret == Gst.StateChangeReturn.FAILURE:
+                logger.warning("Caméra CSI / nvjpegenc non démarrés — fallback OpenCV")
+                pipeline.set_state(Gst.State.NULL)
+                pipeline = None
+        if pipeline is None:
+            if _CV2_AVAILABLE:
+                self._capture_opencv()
+            else:
+                self._capture_synthetic()
+            return
+
+        sink = pipeline.get_by_name("sink")
+        self._status_el = pipeline.get_by_name("status_ov")
+        self._pos_el    = pipeline.get_by_name("pos_ov")
+        self._jpegenc_el = pipeline.get_by_name("jpegenc")
+        self._status_el.set_property("text", f"SIANA | {self._overlay_status}")
+        self._pos_el.set_property("text", f"POS: {self._overlay_pos_m:.2f} m")
+        logger.info("Capture CSI avec encodage JPEG matériel (nvjpegenc)")
+        try:
+            while self._running:
+                sample = sink.emit("try-pull-sample", Gst.SECOND)
+                if sample is None:
+                    continue
+                buf = sample.get_buffer()
+                self._set_frame(buf.extract_dup(0, buf.get_size()))
+        finally:
+            self._status_el = self._pos_el = self._jpegenc_el = None
+            pipeline.set_state(Gst.State.NULL)
+
     # ── Capture OpenCV (USB ou CSI via GStreamer) ──────────────────────────────
 
     def _capture_opencv(self):
+        self._pin_capture_thread()
         # Essayer d'abord le pipeline GStreamer CSI (Jetson Nano + caméra IMX219)
         gst_pipeline = self.GSTREAMER_PIPELINE.format(
             w=self._width, h=self._height, fps=self._fps
@@ -118,23 +265,32 @@ class CameraStream:
             cap.set(cv2.CAP_PROP_FPS,          self._fps)
         self._capture = cap
 
-        interval = 1.0 / self._fps
+        # grab() à chaque image (bloquant, cadencé par le capteur : le tampon
+        # du pilote avance, aucune image périmée) ; retrieve() — conversion
+        # couleur + copie — seulement quand une image doit être publiée.
+        # Avec client du flux, chaque image saisie est publiée ; sinon,
+        # publication au rythme réduit CAMERA_IDLE_FPS (image récente
+        # disponible pour les captures de preuve).
+        interval      = 1.0 / self._fps
+        idle_interval = 1.0 / self.cfg.CAMERA_IDLE_FPS
+        last_publish  = 0.0
 
         while self._running:
-            t0 = time.time()
-            ok, frame = cap.read()
-            if ok:
-                if self._rotation == 180:
-                    frame = cv2.rotate(frame, cv2.ROTATE_180)
-                elif self._rotation == 90:
-                    frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-                frame = self._add_overlay(frame)
-                ok2, buf = cv2.imencode(".jpg", frame,
-                                        [cv2.IMWRITE_JPEG_QUALITY, 85])
-                if ok2:
-                    self._set_frame(bytes(buf))
-            elapsed = time.time() - t0
-            time.sleep(max(0, interval - elapsed))
+            if not cap.grab():
+                time.sleep(interval)
+                continue
+            now = time.monotonic()
+            if self._consumers == 0 and now - last_publish < idle_interval:
+                continue
+            ok, frame = cap.retrieve()
+            if not ok:
+                continue
+            last_publish = now
+            if self._rotation == 180:
+                frame = cv2.rotate(frame, cv2.ROTATE_180)
+            elif self._rotation == 90:
+                frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
+            self._publish(self._add_overlay(frame), self._jpeg_quality)
 
     # ── Flux synthétique (simulation bureau, sans matériel) ───────────────────
 
@@ -143,9 +299,9 @@ class CameraStream:
         Génère des images synthétiques simulant la vue sous-caisse
         d'un TGV pour les tests sans matériel réel.
         """
+        self._pin_capture_thread()
         if not _CV2_AVAILABLE:
             # Flux JPEG mono-couleur si cv2 absent
-            import struct
             # JPEG 2x2 px noir minimal – placeholder
             tiny_jpeg = (
                 b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'
@@ -163,71 +319,85 @@ class CameraStream:
         interval = 1.0 / self._fps
         t_start = time.time()
 
+        # ── Géométrie statique précalculée une fois ──
+        # Fond sombre (sous-caisse) + rails / poutres horizontales
+        background = np.empty((H, W, 3), dtype=np.uint8)
+        background[:] = (18, 20, 30)
+        for i, ry in enumerate([int(H * r) for r in (0.15, 0.35, 0.55, 0.75, 0.90)]):
+            cv2.rectangle(background, (0, ry), (W, ry + 18),
+                          ((28, 42, 55), (38, 55, 70))[i % 2], -1)
+
+        # Boulons hexagonaux : centres entiers, sommets relatifs (_HEX_OFFSETS)
+        bolt_x = ((np.arange(8) * int(W / 7) + 30) % W).astype(np.int32)
+        bolt_y0 = (H * 0.2 + np.arange(8) * 80).astype(np.int32)
+
+        # Câbles : abscisses fixes, ordonnées calculées en une passe NumPy
+        cable_x = np.arange(0, W, 5, dtype=np.int32)
+        cables = ((0.3, (40, 120, 90)), (0.5, (60, 80, 110)), (0.65, (70, 55, 105)))
+
         while self._running:
             t0 = time.time()
             elapsed = t0 - t_start
 
-            # Fond sombre (sous-caisse)
-            frame = np.zeros((H, W, 3), dtype=np.uint8)
-            frame[:] = (18, 20, 30)
-
-            # Rails / poutres horizontales
-            for i, ry in enumerate([int(H * r) for r in (0.15, 0.35, 0.55, 0.75, 0.90)]):
-                cv2.rectangle(frame, (0, ry), (W, ry + 18),
-                              ((28, 42, 55), (38, 55, 70))[i % 2], -1)
+            frame = background.copy()
 
             # Défilement vertical (simulation mouvement)
             scroll = int(elapsed * 60) % H
-            for i in range(8):
-                bx = (i * int(W / 7) + 30) % W
-                by = (int(H * 0.2 + i * 80) + scroll) % H
-                # boulon hexagonal
-                cx, cy, r = bx, by, 8
-                for j in range(6):
-                    import math
-                    a1 = math.radians(j * 60)
-                    a2 = math.radians((j + 1) * 60)
-                    p1 = (int(cx + r * math.cos(a1)), int(cy + r * math.sin(a1)))
-                    p2 = (int(cx + r * math.cos(a2)), int(cy + r * math.sin(a2)))
-                    cv2.line(frame, p1, p2, (90, 110, 140), 2)
+            centers = np.stack([bolt_x, (bolt_y0 + scroll) % H], axis=1)
+            hexes = centers[:, None, :] + _HEX_OFFSETS
+            cv2.polylines(frame, list(hexes), True, (90, 110, 140), 2)
+            for cx, cy in centers.tolist():
                 cv2.circle(frame, (cx, cy), 4, (70, 90, 120), -1)
 
             # Câbles
-            for ci, cy_frac in enumerate((0.3, 0.5, 0.65)):
-                pts = np.array([
-                    [x, int(H * cy_frac + 8 * np.sin((x + int(elapsed * 40)) * 0.03))]
-                    for x in range(0, W, 5)
-                ], dtype=np.int32)
-                cv2.polylines(frame, [pts], False,
-                              [(40, 120, 90), (60, 80, 110), (70, 55, 105)][ci], 3)
+            wave = 8 * np.sin((cable_x + int(elapsed * 40)) * 0.03)
+            for cy_frac, color in cables:
+                ys = (H * cy_frac + wave).astype(np.int32)
+                cv2.polylines(frame, [np.column_stack((cable_x, ys))], False, color, 3)
 
             # Ligne de scan IA
             scan_y = int((elapsed * 80) % H)
             frame[max(0, scan_y - 2):scan_y + 2, :] = (0, 60, 120)
 
             # HUD basique
-            frame = self._add_overlay(frame)
-
-            ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-            if ok:
-                self._set_frame(bytes(buf))
+            self._publish(self._add_overlay(frame), self._jpeg_quality)
 
             elapsed_loop = time.time() - t0
             time.sleep(max(0, interval - elapsed_loop))
 
+    # ── Encodage JPEG ─────────────────────────────────────────────────────────
+
+    def _encode_jpeg(self, frame, quality: int) -> bytes | None:
+        """Encode une image BGR en JPEG (None en cas d'échec)."""
+        if self._tj is not None:
+            return self._tj.encode(
+                frame,
+                quality=quality,
+                pixel_format=TJPF_BGR,
+                jpeg_subsample=TJSAMP_420,
+                # DCT rapide hors inspection : perte de finesse négligeable
+                flags=TJFLAG_FASTDCT if quality < 85 else 0,
+            )
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return bytes(buf) if ok else None
+
     # ── Overlay (horodatage + position) ───────────────────────────────────────
 
     def _add_overlay(self, frame):
         if not _CV2_AVAILABLE:
             return frame
-        now    = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Horodatage reformaté une seule fois par seconde
+        sec = int(time.time())
+        if sec != self._ts_cache[1]:
+            self._ts_cache = (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec)), sec)
+        now    = self._ts_cache[0]
         pos    = f"POS: {self._overlay_pos_m:.2f} m"
         status = self._overlay_status
 
-        # Bande supérieure semi-transparente
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (0, 0), (frame.shape[1], 36), (0, 0, 0), -1)
-        frame = cv2.addWeighted(overlay, 0.55, frame, 0.45, 0)
+        # Bande supérieure semi-transparente : mélange 55 % noir limité à la
+        # bande (équivalent à 0.45 × pixels), sans copie de l'image entière
+        band = frame[:36]
+        band[:] = cv2.convertScaleAbs(band, alpha=0.45)
 
         font = cv2.FONT_HERSHEY_SIMPLEX
         cv2.putText(frame, f"SIANA | {status}", (8, 24),  font, 0.55, (255, 255, 255), 1)
@@ -235,20 +405,123 @@ class CameraStream:
         cv2.putText(frame, pos,                  (frame.shape[1] // 2 - 50, 24), font, 0.50, (80, 200, 255), 1)
         return frame
 
-    def update_overlay(self, pos_m: float, status: str = "INSPECTION"):
+    def update_overlay(self, pos_m: float, status: str = "INSPECTION", inspecting: bool = True):
+        """Met à jour l'overlay ; `inspecting` choisit la qualité JPEG."""
+        # Pipeline NVJPG : texte mis à jour sur les éléments GStreamer,
+        # uniquement si la valeur affichée change
+        pos_el, status_el = self._pos_el, self._status_el
+        if pos_el is not None and round(pos_m, 2) != round(self._overlay_pos_m, 2):
+            pos_el.set_property("text", f"POS: {pos_m:.2f} m")
+        if status_el is not None and status != self._overlay_status:
+            status_el.set_property("text", f"SIANA | {status}")
         self._overlay_pos_m  = pos_m
         self._overlay_status = status
 
+        quality = (self.cfg.CAMERA_JPEG_QUALITY_INSPECTION if inspecting
+                   else self.cfg.CAMERA_JPEG_QUALITY_IDLE)
+        if quality != self._jpeg_quality:
+            self._jpeg_quality = quality
+            jpegenc_el = self._jpegenc_el
+            if jpegenc_el is not None:
+                jpegenc_el.set_property("quality", quality)
+
     # ── Accès interne ─────────────────────────────────────────────────────────
 
     def _set_frame(self, jpeg_bytes: bytes):
-        with self._frame_lock:
-            self._latest_jpeg = jpeg_bytes
-            self._frame_count += 1
+        self._latest = (next(self._seq), jpeg_bytes, None)
+        self._notify_frame()
+
+    def _notify_frame(self):
+        with self._frame_cond:
+            self._frame_cond.notify_all()
+        for cb in self._frame_listeners:
+            cb()
+
+    def add_frame_listener(self, cb):
+        """
+        Enregistre un callback appelé depuis le thread producteur à chaque
+        nouvelle image. Il doit être bref et non bloquant (ex. réveil d'une
+        boucle asyncio via call_soon_threadsafe).
+        """
+        self._frame_listeners.append(cb)
+
+    def _publish(self, frame, quality: int):
+        """
+        Publie une image BGR. Si un client du flux est connecté, elle est
+        confiée au thread d'encodage (la capture n'attend jamais l'encodeur) ;
+        sinon conservée brute et encodée à la demande (get_latest_jpeg).
+        """
+        if self._consumers > 0:
+            # Encodeur en retard : l'image non encodée est remplacée
+            try:
+                self._raw_q.get_nowait()
+            except queue.Empty:
+                pass
+            self._raw_q.put_nowait((frame, quality))
+            return
+        self._latest = (next(self._seq), None, (frame, quality))
+        self._notify_frame()
+
+    def _encode_loop(self):
+        """Thread d'encodage : draine la file 1 place et publie le JPEG."""
+        while self._running:
+            try:
+                frame, quality = self._raw_q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            jpeg = self._encode_jpeg(frame, quality)
+            if jpeg:
+                self._set_frame(jpeg)
+
+    @contextlib.contextmanager
+    def consumer(self):
+        """
+        Déclare un client du flux MJPEG pour la durée du bloc `with` :
+        tant qu'au moins un client est actif, chaque image est encodée.
+        """
+        with self._consumers_lock:
+            self._consumers += 1
+        try:
+            yield self
+        finally:
+            with self._consumers_lock:
+                self._consumers -= 1
+
+    def get_latest(self, encode: bool = True) -> tuple[int, bytes | None]:
+        """
+        Retourne le couple cohérent (n° de séquence, JPEG), sans verrou.
+        encode=False : une image brute non encodée donne JPEG None (pas
+        d'encodage dans le thread appelant, ex. boucle asyncio).
+        """
+        seq, jpeg, pending = self._latest
+        if jpeg is not None or pending is None:
+            return seq, jpeg
+        cached_seq, cached = self._jpeg_cache
+        if cached_seq == seq:
+            return seq, cached
+        if not encode:
+            return seq, None
+        # Encodage paresseux, mis en cache pour cette image
+        jpeg = self._encode_jpeg(*pending)
+        self._jpeg_cache = (seq, jpeg)
+        return seq, jpeg
 
     def get_latest_jpeg(self) -> bytes | None:
-        with self._frame_lock:
-            return self._latest_jpeg
+        return self.get_latest()[1]
+
+    def get_latest_part(self, encode: bool = True) -> tuple[int, bytes | None, bytes | None]:
+        """
+        (n° de séquence, en-tête de partie MJPEG, JPEG). L'en-tête (avec
+        Content-Length) est formaté une fois par image, partagé par les clients.
+        """
+        seq, jpeg = self.get_latest(encode)
+        if jpeg is None:
+            return seq, None, None
+        cached_seq, header = self._part_cache
+        if cached_seq != seq:
+            header = self.MJPEG_HEADER_PREFIX + b"%d" % len(jpeg) + self.MJPEG_HEADER_SUFFIX
+            self._part_cache = (seq, header)
+        return seq, header, jpeg
 
     def capture_snapshot(self) -> bytes | None:
         """Capture et retourne le JPEG courant (pour sauvegarde preuve)."""
@@ -269,18 +542,32 @@ class CameraStream:
 
     @property
     def frame_count(self) -> int:
-        return self._frame_count
+        return self._latest[0]
 
     def mjpeg_generator(self):
         """
         Générateur Python pour streamer le flux MJPEG vers un client HTTP.
+        Bloque jusqu'à la production d'une nouvelle image : chaque image
+        est envoyée exactement une fois, au rythme du producteur.
+        Chaque image produit trois morceaux (en-tête, JPEG, fin de partie).
+        Le générateur compte comme client du flux (voir consumer()).
         Usage :
             for chunk in camera.mjpeg_generator():
                 response.write(chunk)
         """
-        while self._running:
-            jpeg = self.get_latest_jpeg()
-            if jpeg:
-                header = self.MJPEG_HEADER % len(jpeg)
-                yield header + jpeg + b"\r\n"
-            time.sleep(1.0 / self._fps)
+        last_seq = -1
+        with self.consumer():
+            while self._running:
+                with self._frame_cond:
+                    self._frame_cond.wait_for(
+                        lambda: self._latest[0] != last_seq or not self._running,
+                        timeout=1.0,
+                    )
+                seq, header, jpeg = self.get_latest_part()
+                if seq == last_seq:
+                    continue
+                last_seq = seq
+                if jpeg:
+                    yield header
+                    yield jpeg
+                    yield self.MJPEG_PART_END
@@ -33,8 +33,13 @@ class LedController:
     """
     Gestion des LEDs de signalisation et de l'éclairage sous-caisse.
     Supporte les patterns fixes et clignotants.
+
+    Un unique thread persistant (_tick_loop) rend le pattern courant :
+    set_state se contente de publier le pattern et de réveiller le thread.
     """
 
+    TICK_S = 0.05   # résolution du clignotement (20 Hz)
+
     def __init__(self):
         import config as cfg
         self.cfg = cfg
@@ -44,9 +49,11 @@ class LedController:
         self._red_pin    = cfg.LED_RED_PIN
 
         self._current_state = "idle"
-        self._blink_thread  = None
-        self._blink_running = False
+        self._pattern  = LED_PATTERNS["idle"]
+        self._last_out = None   # dernier triplet (vert, orange, rouge) écrit
         self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._tick_running = True
 
         # Éclairage sous-caisse PWM
         self._lighting_duty = cfg.LED_LIGHTING_DEFAULT
@@ -60,6 +67,9 @@ class LedController:
             self._lighting_pwm = GPIO.PWM(cfg.LED_LIGHTING_PWM_PIN, cfg.LED_LIGHTING_FREQ)
             self._lighting_pwm.start(self._lighting_duty)
 
+        self._tick_thread = threading.Thread(target=self._tick_loop, daemon=True)
+        self._tick_thread.start()
+
         logger.info("LedController initialisé")
 
     # ── LEDs état ─────────────────────────────────────────────────────────────
@@ -73,44 +83,46 @@ class LedController:
             logger.warning("État LED inconnu : %s", state_name)
             return
 
-        logger.debug("LED → %s", state_name)
         with self._lock:
+            # Pattern déjà appliqué : aucune écriture GPIO, clignotement conservé
+            if state_name == self._current_state:
+                return
             self._current_state = state_name
+            self._pattern = LED_PATTERNS[state_name]
 
-        self._stop_blink()
-        pattern = LED_PATTERNS[state_name]
-        green, orange, red, freq = pattern
-
-        if freq == 0:
-            self._apply(green, orange, red)
+        logger.debug("LED → %s", state_name)
+        self._wake.set()   # rendu immédiat du nouveau pattern
+
+    def _tick_loop(self):
+        """Thread unique : rend le pattern courant à chaque tick."""
+        while self._tick_running:
+            freq = self._render(time.monotonic())
+            # Pattern fixe : attente jusqu'au prochain changement d'état
+            self._wake.wait(self.TICK_S if freq else None)
+            self._wake.clear()
+
+    def _render(self, now: float) -> float:
+        """Écrit l'état des LEDs à l'instant `now` ; retourne la fréquence."""
+        green, orange, red, freq = self._pattern
+        if freq and int(now * freq * 2) & 1:   # demi-période éteinte
+            out = (False, False, False)
         else:
-            self._blink_running = True
-            self._blink_thread = threading.Thread(
-                target=self._blink_loop,
-                args=(green, orange, red, freq),
-                daemon=True
-            )
-            self._blink_thread.start()
-
-    def _stop_blink(self):
-        self._blink_running = False
-        if self._blink_thread and self._blink_thread.is_alive():
-            self._blink_thread.join(timeout=1.0)
-
-    def _blink_loop(self, green: bool, orange: bool, red: bool, freq: float):
-        period = 1.0 / freq
-        while self._blink_running:
-            self._apply(green, orange, red)
-            time.sleep(period / 2)
-            self._apply(False, False, False)
-            time.sleep(period / 2)
+            out = (green, orange, red)
+        if out != self._last_out:
+            self._last_out = out
+            self._apply(*out)
+        return freq
 
     def _apply(self, green: bool, orange: bool, red: bool):
         if not _GPIO_AVAILABLE:
             return
-        GPIO.output(self._green_pin,  GPIO.HIGH if green  else GPIO.LOW)
-        GPIO.output(self._orange_pin, GPIO.HIGH if orange else GPIO.LOW)
-        GPIO.output(self._red_pin,    GPIO.HIGH if red    else GPIO.LOW)
+        # Écriture groupée des trois broches en un seul appel
+        GPIO.output(
+            [self._green_pin, self._orange_pin, self._red_pin],
+            [GPIO.HIGH if green  else GPIO.LOW,
+             GPIO.HIGH if orange else GPIO.LOW,
+             GPIO.HIGH if red    else GPIO.LOW],
+        )
 
     def flash(self, color: str, times: int = 3, duration_s: float = 0.1):
         """Flash rapide d'une couleur (feedback immédiat, non bloquant)."""
@@ -141,6 +153,8 @@ class LedController:
     def set_lighting(self, duty_pct: float):
         """Règle l'intensité de l'éclairage : 0 = éteint, 100 = max."""
         duty_pct = max(0.0, min(100.0, duty_pct))
+        if duty_pct == self._lighting_duty:
+            return
         self._lighting_duty = duty_pct
         if self._lighting_pwm:
             self._lighting_pwm.ChangeDutyCycle(duty_pct)
@@ -163,7 +177,9 @@ class LedController:
         }
 
     def cleanup(self):
-        self._stop_blink()
+        self._tick_running = False
+        self._wake.set()
+        self._tick_thread.join(timeout=1.0)
         if _GPIO_AVAILABLE:
             self._apply(False, False, False)
             if self._lighting_pwm:
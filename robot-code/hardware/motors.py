@@ -4,11 +4,14 @@
 # Matériel : H-Bridge L298N ou IBT-2 (haute puissance, recommandé)
 # =============================================================================
 
+import array
 import threading
 import time
 import logging
 import math
 
+from hardware.sched import raise_thread_priority
+
 logger = logging.getLogger("siana.motors")
 
 # ── Tentative import RPi.GPIO ──────────────────────────────────────────────
@@ -21,9 +24,30 @@ except (ImportError, RuntimeError):
     logger.warning("Jetson.GPIO non disponible — mode simulation activé")
     _GPIO_AVAILABLE = False
 
+# libgpiod v2 : fronts encodeurs lus par lots dans un thread dédié
+try:
+    import gpiod
+    from gpiod.line import Bias, Direction, Edge
+    _GPIOD_AVAILABLE = hasattr(gpiod, "request_lines")   # API v2 uniquement
+except ImportError:
+    _GPIOD_AVAILABLE = False
+
+
+def _ramp_step(current: float, target: float, step: float) -> float:
+    """Prochaine consigne de rampe : rapproche `current` de `target` d'au plus `step`."""
+    delta = target - current
+    if -step < delta < step:
+        return target
+    return current + step if delta > 0 else current - step
+
 
 class PWMChannel:
-    """Abstraction d'un canal PWM matériel ou simulé."""
+    """
+    Abstraction d'un canal PWM matériel ou simulé.
+    Sur Jetson Nano, GPIO.PWM pilote le contrôleur PWM matériel via sysfs
+    (broches 32/33 uniquement) : seul le rapport cyclique est écrit,
+    on évite donc toute écriture redondante.
+    """
 
     def __init__(self, pin: int, frequency: int = 20000):
         self.pin = pin
@@ -38,6 +62,8 @@ class PWMChannel:
     def set_duty(self, duty: float):
         """duty : 0.0 – 100.0 (%)"""
         duty = max(0.0, min(100.0, duty))
+        if duty == self._duty:
+            return
         self._duty = duty
         if self._pwm:
             self._pwm.ChangeDutyCycle(duty)
@@ -74,16 +100,14 @@ class MotorChannel:
             GPIO.setup(in2_pin, GPIO.OUT)
         self._in1 = in1_pin
         self._in2 = in2_pin
+        self._pins = (in1_pin, in2_pin)
 
-    def _set_direction(self, forward: bool):
-        if not _GPIO_AVAILABLE:
-            return
-        if forward ^ self.inverted:
-            GPIO.output(self._in1, GPIO.HIGH)
-            GPIO.output(self._in2, GPIO.LOW)
-        else:
-            GPIO.output(self._in1, GPIO.LOW)
-            GPIO.output(self._in2, GPIO.HIGH)
+        # (speed > 0) → états (IN1, IN2), inversion de câblage déjà appliquée
+        fwd, rev = (1, 0), (0, 1)
+        if _GPIO_AVAILABLE:
+            fwd, rev = (GPIO.HIGH, GPIO.LOW), (GPIO.LOW, GPIO.HIGH)
+        self._dir_table = {True: rev, False: fwd} if inverted else {True: fwd, False: rev}
+        self._dir_out = None   # dernier couple (IN1, IN2) écrit
 
     def set_speed(self, speed: float):
         """
@@ -91,17 +115,20 @@ class MotorChannel:
         0.0 = frein actif
         """
         speed = max(-100.0, min(100.0, speed))
-        self._speed = speed
         if speed == 0:
-            self.brake()
-            return
-        self._set_direction(speed > 0)
+            return self.brake()
+        self._speed = speed
+        out = self._dir_table[speed > 0]
+        if out is not self._dir_out and _GPIO_AVAILABLE:
+            GPIO.output(self._pins, out)
+        self._dir_out = out
         self._pwm.set_duty(abs(speed))
 
     def brake(self):
         """Freinage actif (court-circuit bobine moteur)."""
         self._speed = 0
         self._pwm.stop()
+        self._dir_out = None
         if _GPIO_AVAILABLE:
             GPIO.output(self._in1, GPIO.HIGH)
             GPIO.output(self._in2, GPIO.HIGH)
@@ -110,6 +137,7 @@ class MotorChannel:
         """Roue libre (coupure alimentation)."""
         self._speed = 0
         self._pwm.stop()
+        self._dir_out = None
         if _GPIO_AVAILABLE:
             GPIO.output(self._in1, GPIO.LOW)
             GPIO.output(self._in2, GPIO.LOW)
@@ -130,16 +158,6 @@ class MotorController:
     Intègre la rampe d'accélération douce et les encodeurs odométriques.
     """
 
-    from config import (
-        MOTOR_LEFT_PWM,  MOTOR_LEFT_IN1,  MOTOR_LEFT_IN2,
-        MOTOR_RIGHT_PWM, MOTOR_RIGHT_IN1, MOTOR_RIGHT_IN2,
-        ENCODER_LEFT_A,  ENCODER_LEFT_B,
-        ENCODER_RIGHT_A, ENCODER_RIGHT_B,
-        ENCODER_TICKS_PER_REV, WHEEL_DIAMETER_MM, WHEEL_BASE_MM,
-        SPEED_MIN_PERCENT, SPEED_MAX_PERCENT, SPEED_DEFAULT,
-        TURN_SPEED_FACTOR, RAMP_STEP, RAMP_INTERVAL_MS,
-    ) if False else None  # évite l'exécution au niveau module
-
     def __init__(self):
         import config as cfg
         self.cfg = cfg
@@ -155,20 +173,26 @@ class MotorController:
         self._current_left  = 0.0
         self._current_right = 0.0
 
-        # Odométrie
-        self._ticks_left  = 0
-        self._ticks_right = 0
+        # Odométrie — compteurs cumulés [gauche, droite], un seul écrivain
+        # par case (callback ou thread encodeur) : pas de verrou dans le chemin ISR.
+        # update_odometry() travaille sur la différence avec le dernier relevé.
+        self._ticks      = array.array("q", [0, 0])
+        self._ticks_seen = (0, 0)
         self._odometry_lock = threading.Lock()
         self._dist_m   = 0.0   # distance totale parcourue (m)
         self._heading  = 0.0   # cap en degrés (0 = avant)
 
-        # Rampe d'accélération
+        self._emergency = False
+
+        self._enc_req     = None   # gpiod.LineRequest (fronts encodeurs)
+        self._enc_thread  = None
+        self._enc_running = False
+
+        # Rampe d'accélération (démarrée après l'init de _emergency, lu par la boucle)
         self._ramp_active = True
         self._ramp_thread = threading.Thread(target=self._ramp_loop, daemon=True)
         self._ramp_thread.start()
 
-        self._emergency = False
-
         # Attacher les interruptions encodeurs
         self._setup_encoders()
 
@@ -178,6 +202,8 @@ class MotorController:
 
     def _setup_encoders(self):
         cfg = self.cfg
+        if _GPIOD_AVAILABLE and self._setup_encoders_gpiod():
+            return
         if not _GPIO_AVAILABLE:
             return
         for pin in (cfg.ENCODER_LEFT_A, cfg.ENCODER_LEFT_B,
@@ -186,15 +212,54 @@ class MotorController:
         GPIO.add_event_detect(cfg.ENCODER_LEFT_A,  GPIO.RISING, callback=self._tick_left)
         GPIO.add_event_detect(cfg.ENCODER_RIGHT_A, GPIO.RISING, callback=self._tick_right)
 
+    def _setup_encoders_gpiod(self) -> bool:
+        """
+        Demande les lignes canal A des encodeurs à libgpiod (fronts montants)
+        et démarre le thread de lecture. False si indisponible → callbacks GPIO.
+        """
+        cfg = self.cfg
+        settings = gpiod.LineSettings(
+            direction=Direction.INPUT, edge_detection=Edge.RISING, bias=Bias.PULL_UP,
+        )
+        lines = (cfg.ENCODER_LEFT_A_LINE, cfg.ENCODER_RIGHT_A_LINE)
+        try:
+            self._enc_req = gpiod.request_lines(
+                cfg.ENCODER_GPIOCHIP, consumer="siana-encoders",
+                config={lines: settings},
+                event_buffer_size=256,
+            )
+        except (OSError, ValueError) as e:
+            logger.warning("libgpiod indisponible pour les encodeurs (%s) — callbacks GPIO", e)
+            return False
+        self._enc_running = True
+        self._enc_thread = threading.Thread(target=self._encoder_loop, args=lines, daemon=True)
+        self._enc_thread.start()
+        logger.info("Encodeurs lus via libgpiod (%s)", cfg.ENCODER_GPIOCHIP)
+        return True
+
+    def _encoder_loop(self, line_left: int, line_right: int):
+        """Un réveil = tous les fronts en attente, comptés en une passe."""
+        req   = self._enc_req
+        ticks = self._ticks
+        while self._enc_running:
+            if not req.wait_edge_events(0.05):
+                continue
+            n_left = n_right = 0
+            for ev in req.read_edge_events():
+                if ev.line_offset == line_left:
+                    n_left += 1
+                elif ev.line_offset == line_right:
+                    n_right += 1
+            if n_left:
+                ticks[0] += n_left if self._current_left >= 0 else -n_left
+            if n_right:
+                ticks[1] += n_right if self._current_right >= 0 else -n_right
+
     def _tick_left(self, _channel):
-        direction = 1 if self._current_left >= 0 else -1
-        with self._odometry_lock:
-            self._ticks_left += direction
+        self._ticks[0] += 1 if self._current_left >= 0 else -1
 
     def _tick_right(self, _channel):
-        direction = 1 if self._current_right >= 0 else -1
-        with self._odometry_lock:
-            self._ticks_right += direction
+        self._ticks[1] += 1 if self._current_right >= 0 else -1
 
     def update_odometry(self):
         """
@@ -203,10 +268,11 @@ class MotorController:
         """
         cfg = self.cfg
         with self._odometry_lock:
-            tl = self._ticks_left
-            tr = self._ticks_right
-            self._ticks_left  = 0
-            self._ticks_right = 0
+            total_l, total_r = self._ticks[0], self._ticks[1]
+            seen_l, seen_r   = self._ticks_seen
+            self._ticks_seen = (total_l, total_r)
+        tl = total_l - seen_l
+        tr = total_r - seen_r
 
         wheel_circ = math.pi * (cfg.WHEEL_DIAMETER_MM / 1000.0)   # m
         dist_l = (tl / cfg.ENCODER_TICKS_PER_REV) * wheel_circ
@@ -225,8 +291,7 @@ class MotorController:
 
     def reset_odometry(self):
         with self._odometry_lock:
-            self._ticks_left = 0
-            self._ticks_right = 0
+            self._ticks_seen = (self._ticks[0], self._ticks[1])
             self._dist_m  = 0.0
             self._heading = 0.0
 
@@ -234,28 +299,21 @@ class MotorController:
 
     def _ramp_loop(self):
         cfg = self.cfg
+        raise_thread_priority(cfg.RAMP_RT_PRIORITY, "rampe moteurs")
         interval = cfg.RAMP_INTERVAL_MS / 1000.0
         step     = cfg.RAMP_STEP
 
         while self._ramp_active:
             if not self._emergency:
-                for side in ('left', 'right'):
-                    target  = self._target_left  if side == 'left' else self._target_right
-                    current = self._current_left if side == 'left' else self._current_right
-
-                    if abs(current - target) < step:
-                        next_val = target
-                    elif current < target:
-                        next_val = current + step
-                    else:
-                        next_val = current - step
-
-                    if side == 'left':
-                        self._current_left = next_val
-                        self._left.set_speed(next_val)
-                    else:
-                        self._current_right = next_val
-                        self._right.set_speed(next_val)
+                # Écriture pont-H / PWM uniquement si la consigne change
+                nl = _ramp_step(self._current_left, self._target_left, step)
+                if nl != self._current_left:
+                    self._current_left = nl
+                    self._left.set_speed(nl)
+                nr = _ramp_step(self._current_right, self._target_right, step)
+                if nr != self._current_right:
+                    self._current_right = nr
+                    self._right.set_speed(nr)
 
             time.sleep(interval)
 
@@ -367,6 +425,11 @@ class MotorController:
 
     def cleanup(self):
         self._ramp_active = False
+        if self._enc_req is not None:
+            self._enc_running = False
+            self._enc_thread.join(timeout=1.0)
+            self._enc_req.release()
+            self._enc_req = None
         self._left.cleanup()
         self._right.cleanup()
         if _GPIO_AVAILABLE:
@@ -0,0 +1,43 @@
+# =============================================================================
+# SIANA — hardware/sched.py
+# Priorité d'ordonnancement et affinité CPU des threads temps réel
+# (caméra, rampe moteurs, ultrasons)
+# =============================================================================
+
+import os
+import logging
+
+logger = logging.getLogger("siana.sched")
+
+
+def raise_thread_priority(rt_priority: int, name: str = ""):
+    """
+    Passe le thread appelant en SCHED_FIFO (priorité `rt_priority`, 1…99).
+    Sans CAP_SYS_NICE : repli sur une niceness -5, sinon priorité inchangée.
+    rt_priority = 0 → aucune modification.
+    """
+    if not rt_priority:
+        return
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(rt_priority))
+        logger.info("Thread %s en SCHED_FIFO (priorité %d)", name, rt_priority)
+        return
+    except (AttributeError, PermissionError, OSError) as e:
+        reason = e
+    try:
+        # Linux : la niceness s'applique au seul thread appelant
+        os.setpriority(os.PRIO_PROCESS, 0, -5)
+        logger.info("Thread %s : SCHED_FIFO refusé (%s) — niceness -5", name, reason)
+    except (AttributeError, PermissionError, OSError):
+        logger.warning("Thread %s : priorité inchangée (%s)", name, reason)
+
+
+def pin_thread(cpus, name: str = ""):
+    """Épingle le thread appelant sur l'ensemble de cœurs `cpus` (None/vide → rien)."""
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        os.sched_setaffinity(0, cpus)   # Linux : 0 = thread appelant
+        logger.info("Thread %s épinglé sur CPU %s", name, sorted(cpus))
+    except OSError as e:
+        logger.warning("Affinité CPU %s non appliquée : %s", name, e)
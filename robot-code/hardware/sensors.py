@@ -3,7 +3,13 @@
 # Capteurs : ultrasons HC-SR04 (obstacles) + INA219 (batterie)
 # =============================================================================
 
+import os
 import time
+import queue
+import select
+import random
+import itertools
+from collections import namedtuple
 import asyncio
 import threading
 import logging
@@ -17,6 +23,13 @@ except (ImportError, RuntimeError):
     _GPIO_AVAILABLE = False
     logger.warning("Jetson.GPIO non disponible — capteurs simulés")
 
+try:
+    import gpiod
+    from gpiod.line import Clock, Direction, Edge
+    _GPIOD_AVAILABLE = hasattr(gpiod, "request_lines")   # API v2 uniquement
+except ImportError:
+    _GPIOD_AVAILABLE = False
+
 try:
     from ina219 import INA219
     _INA_AVAILABLE = True
@@ -24,6 +37,39 @@ except ImportError:
     _INA_AVAILABLE = False
     logger.warning("ina219 non disponible — batterie simulée")
 
+from hardware.sched import pin_thread, raise_thread_priority
+
+# smbus2 : lecture tension + courant INA219 en un seul ioctl I2C_RDWR
+try:
+    from smbus2 import SMBus, i2c_msg
+    _SMBUS2_AVAILABLE = True
+except ImportError:
+    _SMBUS2_AVAILABLE = False
+
+# NumPy : tirages simulés générés en bloc (sinon module random)
+try:
+    import numpy as np
+    _NP_AVAILABLE = True
+except ImportError:
+    _NP_AVAILABLE = False
+
+SIM_SAMPLES = 10_000   # taille des tampons circulaires de simulation
+
+
+def _sim_samples(dist: str, a: float, b: float, ndigits: int):
+    """
+    Itérateur circulaire sur SIM_SAMPLES tirages précalculés et arrondis
+    (`dist` = "normal" → (moyenne, écart-type), "uniform" → [a, b)).
+    Un seul appel NumPy au démarrage au lieu d'un tirage Python par mesure.
+    """
+    if _NP_AVAILABLE:
+        draw = getattr(np.random.default_rng(), dist)
+        buf  = np.round(draw(a, b, SIM_SAMPLES), ndigits).tolist()   # floats Python
+    else:
+        draw = random.gauss if dist == "normal" else random.uniform
+        buf  = [round(draw(a, b), ndigits) for _ in range(SIM_SAMPLES)]
+    return itertools.cycle(buf)
+
 
 # ─── Ultrasons HC-SR04 ────────────────────────────────────────────────────────
 
@@ -31,20 +77,73 @@ class UltrasonicSensor:
     """
     Capteur ultrason HC-SR04.
     Mesure : pulse TRIG 10µs → mesure durée ECHO → distance = vitesse_son × t / 2
+
+    Si libgpiod v2 est disponible et `echo_line` fourni, les fronts ECHO
+    sont horodatés par le noyau (CLOCK_MONOTONIC) et lus sur le fd de la
+    requête de ligne : pas d'attente active ni d'écho manqué sous charge.
+    Sinon (noyau L4T 4.9, sans uAPI v2) : attente epoll des fronts sur le
+    fichier sysfs `value` de la broche ECHO, et en dernier recours
+    scrutation Jetson.GPIO classique.
     """
     SOUND_SPEED_CM_S = 34300  # cm/s à 20°C
+    MIN_RANGE_CM     = 2.0    # portée minimale HC-SR04
 
-    def __init__(self, name: str, trig_pin: int, echo_pin: int, timeout_s: float = 0.03):
+    def __init__(self, name: str, trig_pin: int, echo_pin, timeout_s: float = 0.03,
+                 gpiochip: str = None, echo_line: int = None, sysfs_gpio: int = None):
         self.name = name
         self._trig = trig_pin
         self._echo = echo_pin
         self._timeout = timeout_s
         self._lock = threading.Lock()
         self._last_cm = 999.0   # valeur par défaut = voie libre
+        self._echo_req = None   # gpiod.LineRequest (mode fronts horodatés)
+        self._value_fd = None   # fd sysfs …/gpioN/value (mode epoll)
+        self._epoll    = None
+        self._sim = None if _GPIO_AVAILABLE else _sim_samples("normal", 60, 10, 1)
+
+        # Même garde que ObstacleManager._request_echo_lines : en simulation
+        # (sans Jetson.GPIO pour TRIG), aucun accès au gpiochip
+        if _GPIOD_AVAILABLE and _GPIO_AVAILABLE and gpiochip and echo_line is not None:
+            try:
+                self._echo_req = gpiod.request_lines(
+                    gpiochip,
+                    consumer=f"siana-us-{name}",
+                    config={echo_line: gpiod.LineSettings(
+                        direction=Direction.INPUT,
+                        edge_detection=Edge.BOTH,
+                        event_clock=Clock.MONOTONIC,
+                    )},
+                )
+            except (OSError, ValueError) as e:
+                logger.warning("libgpiod indisponible pour %s (%s) — scrutation GPIO", name, e)
 
         if _GPIO_AVAILABLE:
             GPIO.setup(trig_pin, GPIO.OUT, initial=GPIO.LOW)
-            GPIO.setup(echo_pin, GPIO.IN)
+            # echo_pin None : ECHO lu par une requête partagée (ObstacleManager)
+            if self._echo_req is None and echo_pin is not None:
+                GPIO.setup(echo_pin, GPIO.IN)   # exporte la broche dans sysfs
+                if sysfs_gpio is not None:
+                    self._setup_sysfs_edges(sysfs_gpio)
+
+    def _setup_sysfs_edges(self, gpio: int):
+        """Active les fronts sysfs (edge = both) et enregistre `value` dans un epoll."""
+        base = f"/sys/class/gpio/gpio{gpio}"
+        try:
+            with open(f"{base}/edge", "w") as f:
+                f.write("both")
+            fd = os.open(f"{base}/value", os.O_RDONLY | os.O_NONBLOCK)
+        except OSError as e:
+            logger.warning("Fronts sysfs indisponibles pour %s (%s) — scrutation GPIO", self.name, e)
+            return
+        ep = select.epoll()
+        ep.register(fd, select.EPOLLPRI | select.EPOLLERR)
+        self._value_fd, self._epoll = fd, ep
+
+    def trigger(self):
+        """Impulsion TRIG de 10 µs."""
+        GPIO.output(self._trig, GPIO.HIGH)
+        time.sleep(0.00001)  # 10 µs
+        GPIO.output(self._trig, GPIO.LOW)
 
     def measure_cm(self) -> float:
         """
@@ -53,60 +152,185 @@ class UltrasonicSensor:
         """
         if not _GPIO_AVAILABLE:
             # Simulation : retourne une distance aléatoire plausible
-            import random
-            return round(60 + random.gauss(0, 10), 1)
+            return next(self._sim)
 
         with self._lock:
-            # Impulsion TRIG
-            GPIO.output(self._trig, GPIO.HIGH)
-            time.sleep(0.00001)  # 10 µs
-            GPIO.output(self._trig, GPIO.LOW)
+            if self._echo_req is not None:
+                return self._measure_edges()
+            if self._epoll is not None:
+                return self._measure_epoll()
+
+            # Scrutation : fonctions liées en local et horloge perf_counter_ns
+            # (entière, monotone) pour réduire le coût — donc la gigue — de
+            # chaque itération entre les deux fronts
+            read, echo = GPIO.input, self._echo
+            clock      = time.perf_counter_ns
+            timeout_ns = int(self._timeout * 1e9)
+
+            self.trigger()
 
             # Attente front montant ECHO
-            t_start = time.time()
-            while GPIO.input(self._echo) == 0:
-                if time.time() - t_start > self._timeout:
+            deadline = clock() + timeout_ns
+            while read(echo) == 0:
+                if clock() > deadline:
                     return 999.0
 
-            pulse_start = time.time()
+            pulse_start = clock()
 
             # Attente front descendant ECHO
-            while GPIO.input(self._echo) == 1:
-                if time.time() - pulse_start > self._timeout:
+            deadline = pulse_start + timeout_ns
+            while read(echo) == 1:
+                if clock() > deadline:
                     return 999.0
 
-            pulse_end = time.time()
-
-            duration = pulse_end - pulse_start
+            duration = (clock() - pulse_start) / 1e9
             distance_cm = round((duration * self.SOUND_SPEED_CM_S) / 2.0, 1)
             self._last_cm = distance_cm
             return distance_cm
 
+    def _measure_edges(self) -> float:
+        """Mesure par fronts ECHO horodatés noyau (libgpiod v2)."""
+        req = self._echo_req
+        # Purge des fronts résiduels d'une mesure précédente
+        while req.wait_edge_events(0):
+            req.read_edge_events()
+
+        self.trigger()
+
+        rise_ns  = None
+        deadline = time.monotonic() + 2 * self._timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not req.wait_edge_events(remaining):
+                return 999.0
+            for ev in req.read_edge_events():
+                if ev.event_type == gpiod.EdgeEvent.Type.RISING_EDGE:
+                    rise_ns = ev.timestamp_ns
+                elif rise_ns is not None:
+                    duration = (ev.timestamp_ns - rise_ns) / 1e9
+                    distance_cm = round((duration * self.SOUND_SPEED_CM_S) / 2.0, 1)
+                    self._last_cm = distance_cm
+                    return distance_cm
+
+    def _measure_epoll(self) -> float:
+        """
+        Mesure par fronts sysfs : le thread dort dans epoll_wait jusqu'au
+        front (EPOLLPRI), horodaté au réveil — aucune boucle Python active.
+        """
+        fd, poll = self._value_fd, self._epoll
+        clock    = time.perf_counter_ns
+        # Acquitte un front résiduel (lecture depuis l'offset 0 → réarme POLLPRI).
+        # ECHO encore haut (écho précédent non terminé, jusqu'à ~200 ms sur
+        # certains clones) : on attend sa retombée, sinon cycle sauté — un
+        # front descendant isolé ne doit pas passer pour un obstacle proche
+        if os.pread(fd, 2, 0)[:1] == b"1":
+            if not poll.poll(self._timeout) or os.pread(fd, 2, 0)[:1] != b"0":
+                return 999.0
+
+        self.trigger()
+
+        rise_ns  = None
+        deadline = clock() + int(2 * self._timeout * 1e9)
+        while True:
+            remaining = (deadline - clock()) / 1e9
+            if remaining <= 0 or not poll.poll(remaining):
+                return 999.0
+            t_ns  = clock()
+            level = os.pread(fd, 2, 0)[:1]
+            if level == b"1":
+                rise_ns = t_ns
+            else:
+                if rise_ns is None:
+                    # Ligne vérifiée basse avant TRIG et deux fronts avant le
+                    # réveil : impulsion plus courte que la latence de réveil
+                    # → obstacle au plus près, pas voie libre
+                    distance_cm = self.MIN_RANGE_CM
+                else:
+                    duration = (t_ns - rise_ns) / 1e9
+                    distance_cm = round((duration * self.SOUND_SPEED_CM_S) / 2.0, 1)
+                self._last_cm = distance_cm
+                return distance_cm
+
     @property
     def last_cm(self) -> float:
         return self._last_cm
 
+    def record(self, distance_cm: float):
+        """Enregistre une mesure faite hors du capteur (requête ECHO partagée)."""
+        self._last_cm = distance_cm
+
+    @property
+    def waits_in_kernel(self) -> bool:
+        """True si l'attente ECHO dort dans le noyau (libgpiod ou epoll sysfs)."""
+        return self._echo_req is not None or self._epoll is not None
+
+    def close(self):
+        if self._echo_req is not None:
+            self._echo_req.release()
+            self._echo_req = None
+        if self._epoll is not None:
+            self._epoll.close()
+            os.close(self._value_fd)
+            self._epoll = self._value_fd = None
+
 
 class ObstacleManager:
     """
     Gestion de l'ensemble des capteurs ultrason.
-    Scrute en continu dans un thread dédié.
-    Déclenche des callbacks d'alerte.
+    Avec libgpiod v2, les trois lignes ECHO sont ouvertes dans une seule
+    requête : un thread déclenche les trois TRIG puis lit les fronts
+    horodatés des trois échos dans le même flux d'événements (les
+    HC-SR04 sont orientés différemment, sans diaphonie notable).
+    Sinon, un thread de mesure par capteur à attente ECHO bloquante
+    (gpiod, epoll sysfs) et un seul thread pour les capteurs scrutés,
+    mesurés tour à tour (pas de boucles actives concurrentes sous le GIL).
+    Les alertes sont publiées dans une file bornée et les callbacks
+    exécutés par un thread dispatcher : un callback lent ne retarde
+    jamais le cycle d'écho suivant.
     """
 
+    _CRITICAL, _WARNING = 0, 1
+
+    SCAN_PERIOD_S  = 0.05   # 20 Hz par capteur
+    ECHO_TIMEOUT_S = 0.06   # attente max des fronts d'un cycle groupé
+
     def __init__(self):
         import config as cfg
         self.cfg = cfg
+        echo_lines = {
+            "front": cfg.US_FRONT_ECHO_LINE,
+            "rear":  cfg.US_REAR_ECHO_LINE,
+            "left":  cfg.US_LEFT_ECHO_LINE,
+        }
+        # Requête libgpiod commune aux trois ECHO (None → lecture par capteur)
+        self._echo_req   = self._request_echo_lines(cfg.US_GPIOCHIP, echo_lines.values())
+        self._line_names = {line: name for name, line in echo_lines.items()}
+        shared = self._echo_req is not None
+
+        def _sensor(name, trig, echo):
+            if shared:
+                return UltrasonicSensor(name, trig, None)
+            line = echo_lines[name]
+            return UltrasonicSensor(name, trig, echo,
+                                    gpiochip=cfg.US_GPIOCHIP, echo_line=line,
+                                    sysfs_gpio=cfg.US_SYSFS_GPIO_BASE + line)
+
         self._sensors = {
-            "front": UltrasonicSensor("front", cfg.US_FRONT_TRIG, cfg.US_FRONT_ECHO),
-            "rear":  UltrasonicSensor("rear",  cfg.US_REAR_TRIG,  cfg.US_REAR_ECHO),
-            "left":  UltrasonicSensor("left",  cfg.US_LEFT_TRIG,  cfg.US_LEFT_ECHO),
+            "front": _sensor("front", cfg.US_FRONT_TRIG, cfg.US_FRONT_ECHO),
+            "rear":  _sensor("rear",  cfg.US_REAR_TRIG,  cfg.US_REAR_ECHO),
+            "left":  _sensor("left",  cfg.US_LEFT_TRIG,  cfg.US_LEFT_ECHO),
         }
-        self._readings = {k: 999.0 for k in self._sensors}
+        # Dernière mesure par capteur : (distance_cm, horodatage monotonic)
+        # Écrite par le(s) thread(s) de mesure sous _lock.
+        self._readings = {k: (999.0, 0.0) for k in self._sensors}
+        self._lock = threading.Lock()
+        self._events = queue.Queue(maxsize=32)   # (niveau, capteur, distance_cm)
         self._callbacks_warning  = []   # callable(sensor_name, dist_cm)
         self._callbacks_critical = []   # callable(sensor_name, dist_cm)
         self._running = False
+        self._stop_event = threading.Event()   # interrompt les attentes à l'arrêt
         self._thread  = None
+        self._sensor_threads = []
 
     def on_warning(self, cb):
         """Enregistre un callback déclenché à distance d'avertissement."""
@@ -116,64 +340,244 @@ class ObstacleManager:
         """Enregistre un callback déclenché à distance critique → arrêt requis."""
         self._callbacks_critical.append(cb)
 
+    @staticmethod
+    def _request_echo_lines(gpiochip: str, lines):
+        """Ouvre les lignes ECHO en une requête libgpiod v2 (fronts horodatés), ou None."""
+        if not (_GPIOD_AVAILABLE and _GPIO_AVAILABLE and gpiochip):
+            return None
+        try:
+            return gpiod.request_lines(
+                gpiochip,
+                consumer="siana-us",
+                config={tuple(lines): gpiod.LineSettings(
+                    direction=Direction.INPUT,
+                    edge_detection=Edge.BOTH,
+                    event_clock=Clock.MONOTONIC,
+                )},
+            )
+        except (OSError, ValueError) as e:
+            logger.warning("Requête ECHO groupée indisponible (%s) — lecture par capteur", e)
+            return None
+
     def start(self):
         self._running = True
+        self._stop_event.clear()
+        if self._echo_req is not None:
+            self._sensor_threads = [threading.Thread(target=self._group_loop, daemon=True)]
+        else:
+            # Attente ECHO bloquante (gpiod / epoll) : un thread par capteur ;
+            # scrutation active : un seul thread, capteurs mesurés tour à tour
+            blocking = [(n, s) for n, s in self._sensors.items() if s.waits_in_kernel]
+            polled   = [(n, s) for n, s in self._sensors.items() if not s.waits_in_kernel]
+            groups   = [[item] for item in blocking] + ([polled] if polled else [])
+            self._sensor_threads = [
+                threading.Thread(target=self._sensor_loop, args=(group,), daemon=True)
+                for group in groups
+            ]
+        for t in self._sensor_threads:
+            t.start()
         self._thread = threading.Thread(target=self._scan_loop, daemon=True)
         self._thread.start()
         logger.info("ObstacleManager démarré")
 
     def stop(self):
         self._running = False
+        self._stop_event.set()
+        for t in self._sensor_threads:
+            t.join(timeout=1.0)
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        for sensor in self._sensors.values():
+            sensor.close()
+        if self._echo_req is not None:
+            self._echo_req.release()
+            self._echo_req = None
+
+    def _sensor_loop(self, sensors: list):
+        """
+        Thread de mesure de `sensors` [(nom, capteur)], mesurés l'un après
+        l'autre à chaque cycle, cadencé à SCAN_PERIOD_S.
+        """
+        cfg = self.cfg
+        label = "ultrason " + "/".join(name for name, _ in sensors)
+        # Un retard d'ordonnancement de 1 ms fausse la mesure de ~17 cm.
+        # Uniquement si l'attente ECHO est bloquante : un thread SCHED_FIFO
+        # en scrutation active affamerait son cœur
+        if all(sensor.waits_in_kernel for _, sensor in sensors):
+            pin_thread(cfg.US_CPU_AFFINITY, label)
+            raise_thread_priority(cfg.US_RT_PRIORITY, label)
+        period  = self.SCAN_PERIOD_S
+        min_cm  = cfg.US_MIN_DISTANCE_CM       # seuils en variables locales
+        warn_cm = cfg.US_WARNING_DISTANCE_CM
+        t_next = time.monotonic()
+        while self._running:
+            for name, sensor in sensors:
+                self._record(name, sensor.measure_cm(), min_cm, warn_cm)
+            # Échéance fixe (pas de dérive) ; après un dépassement, on repart de maintenant
+            t_next = max(t_next + period, time.monotonic())
+            if self._stop_event.wait(t_next - time.monotonic()):
+                break
+
+    def _group_loop(self):
+        """Thread de mesure unique (requête ECHO partagée), cadencé à SCAN_PERIOD_S."""
+        cfg = self.cfg
+        pin_thread(cfg.US_CPU_AFFINITY, "ultrasons")
+        raise_thread_priority(cfg.US_RT_PRIORITY, "ultrasons")
+        period  = self.SCAN_PERIOD_S
+        min_cm  = cfg.US_MIN_DISTANCE_CM
+        warn_cm = cfg.US_WARNING_DISTANCE_CM
+        t_next = time.monotonic()
+        while self._running:
+            for name, d in self._measure_group().items():
+                self._record(name, d, min_cm, warn_cm)
+            t_next = max(t_next + period, time.monotonic())
+            if self._stop_event.wait(t_next - time.monotonic()):
+                break
+
+    def _measure_group(self) -> dict:
+        """
+        Un cycle de mesure des trois capteurs : TRIG successifs, puis fronts
+        ECHO lus par lots sur la requête commune et répartis par ligne.
+        Capteur sans écho complet avant ECHO_TIMEOUT_S → 999.0 (voie libre).
+        """
+        req = self._echo_req
+        while req.wait_edge_events(0):   # purge d'un cycle précédent
+            req.read_edge_events()
+
+        for sensor in self._sensors.values():
+            sensor.trigger()
+
+        names   = self._line_names
+        rising  = gpiod.EdgeEvent.Type.RISING_EDGE
+        k       = UltrasonicSensor.SOUND_SPEED_CM_S / 2e9   # ns → cm (aller-retour)
+        dist    = dict.fromkeys(self._sensors, 999.0)
+        rise_ns = {}
+        pending = len(dist)
+        deadline = time.monotonic() + self.ECHO_TIMEOUT_S
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not req.wait_edge_events(remaining):
+                break
+            for ev in req.read_edge_events():
+                name = names[ev.line_offset]
+                if ev.event_type == rising:
+                    rise_ns[name] = ev.timestamp_ns
+                elif name in rise_ns:
+                    dist[name] = round((ev.timestamp_ns - rise_ns.pop(name)) * k, 1)
+                    pending -= 1
+
+        for name, d in dist.items():
+            self._sensors[name].record(d)
+        return dist
+
+    def _record(self, name: str, d: float, min_cm: float, warn_cm: float):
+        """Enregistre une mesure et publie l'alerte correspondante."""
+        with self._lock:
+            self._readings[name] = (d, time.monotonic())
+        if d < min_cm:
+            self._post_event(self._CRITICAL, name, d)
+        elif d < warn_cm:
+            self._post_event(self._WARNING, name, d)
+
+    def _post_event(self, level: int, name: str, d: float):
+        """Publie une alerte sans bloquer ; file pleine → l'alerte la plus ancienne est écartée."""
+        while True:
+            try:
+                self._events.put_nowait((level, name, d))
+                return
+            except queue.Full:
+                try:
+                    self._events.get_nowait()
+                except queue.Empty:
+                    pass
 
     def _scan_loop(self):
-        cfg = self.cfg
+        """
+        Dispatcher : draine la file et exécute les callbacks. Seule l'alerte
+        la plus récente par (niveau, capteur) est traitée à chaque réveil.
+        """
         while self._running:
-            for name, sensor in self._sensors.items():
-                d = sensor.measure_cm()
-                self._readings[name] = d
-                if d < cfg.US_MIN_DISTANCE_CM:
-                    for cb in self._callbacks_critical:
-                        try:
-                            cb(name, d)
-                        except Exception:
-                            pass
-                elif d < cfg.US_WARNING_DISTANCE_CM:
-                    for cb in self._callbacks_warning:
-                        try:
-                            cb(name, d)
-                        except Exception:
-                            pass
-            time.sleep(0.05)   # 20 Hz
+            try:
+                first = self._events.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            pending = {(first[0], first[1]): first[2]}
+            while True:
+                try:
+                    level, name, d = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                pending[(level, name)] = d
+            # Alertes critiques d'abord
+            for (level, name), d in sorted(pending.items()):
+                callbacks = (self._callbacks_critical if level == self._CRITICAL
+                             else self._callbacks_warning)
+                for cb in callbacks:
+                    try:
+                        cb(name, d)
+                    except Exception:
+                        pass
 
     def get_readings(self) -> dict:
-        return dict(self._readings)
+        return {k: d for k, (d, _t) in self._readings.items()}
 
     def is_path_clear(self, direction: str = "front") -> bool:
-        """True si la voie est libre (distance > seuil critique)."""
-        return self._readings.get(direction, 999.0) > self.cfg.US_MIN_DISTANCE_CM
+        """
+        True si la voie est libre (distance > seuil critique) et que la
+        mesure date de moins de US_MAX_READING_AGE_S secondes.
+        """
+        reading = self._readings.get(direction)
+        if reading is None:
+            return True
+        d, t = reading
+        if time.monotonic() - t > self.cfg.US_MAX_READING_AGE_S:
+            return False
+        return d > self.cfg.US_MIN_DISTANCE_CM
 
 
 # ─── Batterie INA219 ──────────────────────────────────────────────────────────
 
+# Mesure batterie publiée par échange atomique de référence (lecture sans verrou)
+_BatteryReading = namedtuple("_BatteryReading", "soc_pct voltage_v current_a power_w")
+
 class BatteryMonitor:
     """
     Surveillance batterie via INA219 (I2C).
     Mesure : tension bus (V), courant (A), puissance (W).
     Calcul : SOC (State of Charge) en %.
+
+    L'INA219 n'auto-incrémente pas son pointeur de registre : pas de
+    lecture en bloc. Avec smbus2, les deux couples pointeur/lecture
+    (BUS_VOLTAGE, CURRENT) sont enchaînés en START répétés dans une
+    seule transaction I2C_RDWR ; sinon, appels pi-ina219 successifs.
     """
 
+    _REG_BUS_VOLTAGE = 0x02
+    _REG_CURRENT     = 0x04
+
+    # Calibrage INA219 tel qu'écrit par pi-ina219 (max_expected_amps fourni) :
+    # LSB courant = I_max / 32800, borné par la résolution du registre CALIBRATION
+    _CURRENT_LSB_FACTOR  = 32800
+    _CALIBRATION_FACTOR  = 0.04096
+    _MAX_CALIBRATION     = 0xFFFE
+
     def __init__(self):
         import config as cfg
         self.cfg = cfg
         self._ina = None
-        self._soc = 100.0
-        self._voltage = cfg.BATTERY_NOMINAL_V
-        self._current_a = 0.0
-        self._power_w   = 0.0
-        self._lock = threading.Lock()
+        self._reading = _BatteryReading(100.0, cfg.BATTERY_NOMINAL_V, 0.0, 0.0)
+        self._sim_v   = cfg.BATTERY_NOMINAL_V   # tension simulée non arrondie
+        self._sim_dv  = _sim_samples("uniform", 0, 0.001, 6)
+        self._sim_i   = _sim_samples("uniform", 1.5, 3.5, 2)
         self._running = False
+        self._stop_event = threading.Event()
         self._thread  = None
         self._callbacks_low = []  # callable(soc_pct)
+        self._bus = None          # smbus2.SMBus (lecture groupée)
+        self._current_lsb = max(  # A par bit du registre CURRENT
+            cfg.BATTERY_MAX_EXPECTED_A / self._CURRENT_LSB_FACTOR,
+            self._CALIBRATION_FACTOR / (cfg.BATTERY_SHUNT_OHM * self._MAX_CALIBRATION),
+        )
 
         if _INA_AVAILABLE:
             try:
@@ -193,32 +597,73 @@ class BatteryMonitor:
                 logger.error("Erreur INA219 : %s", e)
                 self._ina = None
 
+        if self._ina and _SMBUS2_AVAILABLE:
+            try:
+                self._bus = SMBus(cfg.BATTERY_I2C_BUS)
+            except OSError as e:
+                logger.warning("Bus I2C-%d indisponible (%s) — lectures pi-ina219",
+                               cfg.BATTERY_I2C_BUS, e)
+
+    def _read_vi(self):
+        """
+        Tension bus (V) et courant (A) en une transaction I2C.
+        None si indisponible ou en débordement (OVF) : l'appelant repasse
+        par pi-ina219, qui gère l'ajustement automatique du gain.
+        """
+        addr = self.cfg.BATTERY_I2C_ADDR
+        rd_v = i2c_msg.read(addr, 2)
+        rd_i = i2c_msg.read(addr, 2)
+        try:
+            self._bus.i2c_rdwr(
+                i2c_msg.write(addr, [self._REG_BUS_VOLTAGE]), rd_v,
+                i2c_msg.write(addr, [self._REG_CURRENT]),     rd_i,
+            )
+        except OSError as e:
+            logger.debug("Lecture I2C groupée INA219 en échec : %s", e)
+            return None
+        raw_v = int.from_bytes(bytes(rd_v), "big")
+        if raw_v & 0x01:   # OVF : calcul courant/puissance hors plage
+            return None
+        v = (raw_v >> 3) * 0.004                       # LSB 4 mV
+        i = int.from_bytes(bytes(rd_i), "big", signed=True) * self._current_lsb
+        return v, i
+
     def on_low_battery(self, cb):
         self._callbacks_low.append(cb)
 
     def start(self):
         self._running = True
+        self._stop_event.clear()
         self._thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self._thread.start()
         logger.info("BatteryMonitor démarré")
 
     def stop(self):
         self._running = False
+        self._stop_event.set()   # réveille immédiatement la boucle (pas d'attente de 2 s)
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        if self._bus is not None:
+            self._bus.close()
+            self._bus = None
 
     def _monitor_loop(self):
         cfg = self.cfg
         alerted = False
+        t_next = time.monotonic()
         while self._running:
             try:
                 if self._ina:
-                    v = self._ina.voltage()
-                    i = self._ina.current() / 1000.0    # mA → A
-                    p = self._ina.power()   / 1000.0    # mW → W
+                    # Puissance calculée localement (registre POWER non lu)
+                    vi = self._read_vi() if self._bus is not None else None
+                    if vi is None:
+                        vi = (self._ina.voltage(), self._ina.current() / 1000.0)   # mA → A
+                    v, i = vi
+                    p = round(v * i, 1)
                 else:
                     # Simulation : décharge linéaire lente
-                    import random
-                    v = self._voltage - random.uniform(0, 0.001)
-                    i = round(random.uniform(1.5, 3.5), 2)
+                    v = self._sim_v = self._sim_v - next(self._sim_dv)
+                    i = next(self._sim_i)
                     p = round(v * i, 1)
 
                 # SOC = interpolation linéaire Vmin…Vmax → 0…100%
@@ -226,11 +671,8 @@ class BatteryMonitor:
                        (cfg.BATTERY_MAX_V - cfg.BATTERY_MIN_V)) * 100.0
                 soc = max(0.0, min(100.0, round(soc, 1)))
 
-                with self._lock:
-                    self._voltage   = v
-                    self._current_a = i
-                    self._power_w   = p
-                    self._soc       = soc
+                # Valeurs arrondies une fois ici ; un seul échange de référence
+                self._reading = _BatteryReading(soc, round(v, 2), round(i, 3), p)
 
                 if soc < cfg.BATTERY_LOW_THRESHOLD and not alerted:
                     alerted = True
@@ -246,25 +688,22 @@ class BatteryMonitor:
             except Exception as e:
                 logger.error("Erreur lecture batterie : %s", e)
 
-            time.sleep(2.0)   # lecture toutes les 2 s (INA219 lent en mode haute précision)
+            # lecture toutes les 2 s (INA219 lent en mode haute précision)
+            t_next = max(t_next + 2.0, time.monotonic())
+            if self._stop_event.wait(t_next - time.monotonic()):
+                break
 
     @property
     def soc(self) -> float:
-        return self._soc
+        return self._reading.soc_pct
 
     @property
     def voltage(self) -> float:
-        return self._voltage
+        return self._reading.voltage_v
 
     @property
     def current_a(self) -> float:
-        return self._current_a
+        return self._reading.current_a
 
     def get_telemetry(self) -> dict:
-        with self._lock:
-            return {
-                "soc_pct":    self._soc,
-                "voltage_v":  round(self._voltage,   2),
-                "current_a":  round(self._current_a, 3),
-                "power_w":    round(self._power_w,   1),
-            }
+        return self._reading._asdict()
@@ -39,6 +39,23 @@ from control.safety    import SafetyManager
 from server.api        import RobotServer
 
 
+# ─── Affinité CPU ──────────────────────────────────────────────────────────
+
+def pin_main_thread():
+    """
+    Épingle le thread principal (boucle asyncio) sur MAIN_CPU_AFFINITY.
+    Appelé avant la création des autres threads, qui héritent du masque ;
+    le thread caméra se ré-épingle sur CAMERA_CPU_AFFINITY.
+    """
+    if not cfg.MAIN_CPU_AFFINITY or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        os.sched_setaffinity(0, cfg.MAIN_CPU_AFFINITY)
+        logger.info("Boucle principale épinglée sur CPU %s", sorted(cfg.MAIN_CPU_AFFINITY))
+    except OSError as e:
+        logger.warning("Affinité CPU non appliquée : %s", e)
+
+
 # ─── Initialisation ────────────────────────────────────────────────────────
 
 def build_robot():
@@ -122,36 +139,62 @@ async def odometry_loop(motors):
     La boucle encodeur est gérée par interruptions GPIO,
     cette tâche agrège les ticks accumulés.
     """
+    loop   = asyncio.get_running_loop()
+    t_next = loop.time()
     while True:
         motors.update_odometry()
-        await asyncio.sleep(0.1)
+        # Échéance fixe : la durée du calcul ne décale pas la période
+        t_next = max(t_next + 0.1, loop.time())
+        await asyncio.sleep(t_next - loop.time())
 
 
 # ─── Shutdown propre ───────────────────────────────────────────────────────
 
-def create_shutdown_handler(components):
-    def _shutdown(signum, frame):
-        logger.warning("Signal %d reçu — arrêt propre en cours...", signum)
-
-        # 1. Arrêt immédiat des moteurs
-        try:
-            components["motors"].emergency_stop()
-        except Exception:
-            pass
-
-        # 2. Arrêt composants
+async def stop_components(components, main_task):
+    """
+    Arrête chaque composant (stop / shutdown / cleanup, coroutine acceptée
+    — ex. RobotServer.stop), puis annule la tâche principale.
+    """
+    try:
         for name, comp in components.items():
             for method in ("stop", "shutdown", "cleanup"):
                 fn = getattr(comp, method, None)
                 if callable(fn):
                     try:
-                        fn()
+                        res = fn()
+                        if asyncio.iscoroutine(res):
+                            await res
                         break
                     except Exception:
-                        pass
+                        # Méthode suivante tentée en repli
+                        logger.exception("Erreur arrêt %s.%s", name, method)
+    finally:
+        main_task.cancel()
 
-        logger.info("Arrêt propre terminé")
-        sys.exit(0)
+
+def create_shutdown_handler(components, main_task):
+    """Handler de signal exécuté sur la boucle asyncio (loop.add_signal_handler)."""
+    shutdown_task = None   # référence forte : la boucle ne garde qu'une référence faible
+
+    def _log_result(task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Arrêt interrompu", exc_info=task.exception())
+
+    def _shutdown(signum):
+        nonlocal shutdown_task
+        if shutdown_task is not None:
+            return
+        logger.warning("Signal %d reçu — arrêt propre en cours...", signum)
+
+        # 1. Arrêt immédiat des moteurs
+        try:
+            components["motors"].emergency_stop()
+        except Exception:
+            logger.exception("Arrêt d'urgence moteurs en échec")
+
+        # 2. Arrêt composants (sur la boucle, tâches serveur attendues)
+        shutdown_task = asyncio.ensure_future(stop_components(components, main_task))
+        shutdown_task.add_done_callback(_log_result)
 
     return _shutdown
 
@@ -160,12 +203,14 @@ def create_shutdown_handler(components):
 
 async def main():
     # Construction du robot
+    pin_main_thread()
     components = build_robot()
 
-    # Handlers signaux POSIX (Ctrl+C, SIGTERM)
-    handler = create_shutdown_handler(components)
+    # Handlers signaux POSIX (Ctrl+C, SIGTERM), exécutés sur la boucle asyncio
+    loop = asyncio.get_running_loop()
+    handler = create_shutdown_handler(components, asyncio.current_task())
     for sig in (signal.SIGINT, signal.SIGTERM):
-        signal.signal(sig, handler)
+        loop.add_signal_handler(sig, handler, sig)
 
     logger.info("────────────────────────────────────────")
     logger.info("WebSocket  : ws://0.0.0.0:%d", cfg.SERVER_PORT)
@@ -175,10 +220,13 @@ async def main():
     logger.info("Robot prêt — en attente de connexion opérateur")
 
     # Tâches parallèles
-    await asyncio.gather(
-        odometry_loop(components["motors"]),
-        components["server"].start(),
-    )
+    try:
+        await asyncio.gather(
+            odometry_loop(components["motors"]),
+            components["server"].start(),
+        )
+    except asyncio.CancelledError:
+        logger.info("Arrêt propre terminé")
 
 
 if __name__ == "__main__":
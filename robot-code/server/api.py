@@ -10,10 +10,16 @@
 
 import asyncio
 import json
+import socket
+import struct
 import time
 import logging
 import traceback
+from collections import deque
 from typing import Set
+from urllib.parse import parse_qs, urlsplit
+
+from control.navigation import RobotState
 
 logger = logging.getLogger("siana.server")
 
@@ -25,6 +31,13 @@ except ImportError:
     _WS_AVAILABLE = False
     logger.error("websockets non installé — pip install websockets")
 
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    _ORJSON_AVAILABLE = False
+    logger.info("orjson non installé — sérialisation json standard")
+
 try:
     from aiohttp import web
     _AIOHTTP_AVAILABLE = True
@@ -33,6 +46,144 @@ except ImportError:
     logger.error("aiohttp non installé — pip install aiohttp")
 
 
+# Clés non-str (int, enum…) acceptées comme par json.dumps ; numpy natif
+_ORJSON_OPTS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if _ORJSON_AVAILABLE else 0
+
+
+def _dumps(data) -> str:
+    """
+    Sérialise en texte JSON (orjson si disponible). Retourne str et non
+    bytes : websockets enverrait des bytes en trame binaire, réservée
+    aux clients ?format=bin.
+    """
+    if _ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str, option=_ORJSON_OPTS).decode()
+    return json.dumps(data, default=str)
+
+
+def _loads(raw):
+    # orjson.JSONDecodeError hérite de json.JSONDecodeError
+    if _ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _make_listen_socket(host: str, port: int, buffer_bytes: int) -> socket.socket:
+    """
+    Socket d'écoute TCP pré-configurée : TCP_NODELAY (pas de Nagle sur les
+    petites trames de commande) et tampons noyau élargis pour le flux MJPEG.
+    Sous Linux ces options sont héritées par les connexions acceptées.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, buffer_bytes)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, buffer_bytes)
+    sock.bind((host, port))
+    sock.setblocking(False)
+    return sock
+
+
+# Enregistrement binaire d'un échantillon de télémétrie (little-endian, 46 o) :
+# timestamp, état (RobotState), vitesse %, distance m, cap °, E-STOP,
+# dernière commande (s), ultrasons avant/arrière/gauche (cm), SOC %, tension V
+_TELEMETRY_BIN = struct.Struct("<dBfff?ffffff")
+
+
+def _pack_telemetry(sample: dict) -> bytes:
+    d = sample["data"]
+    robot, safety, battery = d["robot"], d["safety"], d["battery"]
+    obstacles = safety["obstacles"]
+    return _TELEMETRY_BIN.pack(
+        sample["timestamp"],
+        RobotState[robot["state"]],
+        robot["speed_pct"],
+        robot["distance_m"],
+        robot["heading_deg"],
+        safety["estop"],
+        safety["last_cmd_ago_s"],
+        obstacles.get("front", 999.0),
+        obstacles.get("rear",  999.0),
+        obstacles.get("left",  999.0),
+        battery["soc_pct"],
+        battery["voltage_v"],
+    )
+
+
+def _ws_wants_binary(ws) -> bool:
+    """True si le client s'est connecté avec ?format=bin."""
+    path = getattr(ws, "path", None)
+    if path is None:   # websockets ≥ 14 : ws.request.path
+        path = getattr(getattr(ws, "request", None), "path", "")
+    return parse_qs(urlsplit(path).query).get("format") == ["bin"]
+
+
+class TelemetryBatcher:
+    """
+    Regroupe les échantillons de télémétrie en une seule trame WebSocket.
+    Un lot est envoyé dès que `max_items` échantillons sont accumulés
+    ou que `flush_interval` secondes se sont écoulées depuis le premier :
+    `send_batch` reçoit la liste des échantillons dans l'ordre.
+    """
+
+    def __init__(self, send_batch, max_items: int, flush_interval: float):
+        self._send_batch     = send_batch
+        self._max_items      = max(1, max_items)
+        self._flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def put(self, sample: dict):
+        self._queue.put_nowait(sample)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._flush_interval
+            while len(batch) < self._max_items:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._send_batch(batch)
+            except Exception as e:
+                logger.debug("Erreur envoi lot télémétrie : %s", e)
+
+
+class _ClientOutbox:
+    """
+    File d'émission d'un client WebSocket, vidée par sa tâche d'écriture.
+    Réponses directes (hello, cmd_ack, pong, error) : jamais écartées,
+    émises en priorité. Diffusions (état, télémétrie) : file bornée,
+    la plus ancienne écartée si le client est lent.
+    """
+
+    __slots__ = ("replies", "broadcasts", "_wake")
+
+    def __init__(self, max_broadcasts: int):
+        self.replies    = deque()
+        self.broadcasts = deque(maxlen=max_broadcasts)
+        self._wake      = asyncio.Event()
+
+    def reply(self, msg):
+        self.replies.append(msg)
+        self._wake.set()
+
+    def push(self, msg):
+        self.broadcasts.append(msg)   # maxlen : écarte la plus ancienne
+        self._wake.set()
+
+    async def get(self):
+        while not (self.replies or self.broadcasts):
+            self._wake.clear()
+            await self._wake.wait()
+        return (self.replies or self.broadcasts).popleft()
+
+
 class RobotServer:
     """
     Serveur réseau embarqué sur le Jetson Nano.
@@ -41,7 +192,7 @@ class RobotServer:
     ┌─────────────────────────────────────────────────────────────┐
     │  Opérateur (tablette / PC web-poc)                          │
     │       │ WebSocket ws://IP:8765                               │
-    │       │ ← télémétrie JSON 5Hz                                │
+    │       │ ← télémétrie JSON 5Hz (lots "telemetry_batch")       │
     │       │ → commandes JSON                                     │
     │       │                                                      │
     │       │ HTTP GET /stream              ← MJPEG caméra         │
@@ -55,8 +206,16 @@ class RobotServer:
     Mesure de latence WebSocket :
     - Le serveur répond à {"action":"ping"} avec {"type":"pong","ts":...}
     - Le client calcule RTT = now - ts
+
+    Télémétrie :
+    - par défaut : {"type":"telemetry_batch","items":[...]} (JSON texte)
+    - ws://IP:8765/?format=bin : trames binaires, N enregistrements
+      _TELEMETRY_BIN concaténés (les autres messages restent en JSON)
     """
 
+    WS_OUT_QUEUE = 4   # diffusions en attente max par client WebSocket
+    TELEMETRY_CACHE_S = 0.1   # âge max d'une télémétrie réutilisée (status, hello)
+
     def __init__(self, navigation, safety, motors, battery, leds, camera):
         self._nav     = navigation
         self._safety  = safety
@@ -66,40 +225,81 @@ class RobotServer:
         self._camera  = camera
 
         self._ws_clients: Set[WebSocketServerProtocol] = set()
+        self._ws_binary:  Set[WebSocketServerProtocol] = set()   # ?format=bin
+        # File d'émission par client (_ClientOutbox), vidée par une tâche dédiée
+        self._ws_outq: dict = {}
         self._ws_lock = asyncio.Lock()
 
+        # Dernière télémétrie construite : (horodatage monotonic, dict)
+        # remplacée d'un bloc, jamais modifiée en place
+        self._telem_cache = (0.0, {})
+
+        # Flux MJPEG : future partagée résolue à chaque nouvelle image caméra
+        self._loop          = None
+        self._frame_fut     = None
+        self._stream_viewers = 0
+
+        # Tâches de fond et serveurs, conservés pour stop()
+        self._tasks       = []
+        self._ws_server   = None
+        self._http_runner = None
+
         import config as cfg
         self._cfg = cfg
 
+        self._telemetry_batcher = TelemetryBatcher(
+            self._broadcast_telemetry,
+            cfg.TELEMETRY_BATCH_MAX,
+            cfg.TELEMETRY_FLUSH_INTERVAL,
+        )
+
     # ═══════════════════════════════════════════════════════════════════════════
     # WebSocket Server
     # ═══════════════════════════════════════════════════════════════════════════
 
     async def _ws_handler(self, ws: "WebSocketServerProtocol"):
         """Gère une connexion WebSocket entrante."""
-        import config as cfg
+        cfg = self._cfg
         addr = ws.remote_address
         logger.info("WS connexion : %s", addr)
 
+        binary = _ws_wants_binary(ws)
+        # État initial : premier message de la file d'émission du client
+        hello = _dumps({
+            "type":    "hello",
+            "version": "SIANA-2026",
+            "telemetry_format": "bin" if binary else "json",
+            "state":   self._latest_telemetry(),
+        })
+
         async with self._ws_lock:
             if len(self._ws_clients) >= cfg.MAX_WS_CLIENTS:
                 await ws.close(1013, "Trop de connexions simultanées")
                 logger.warning("Connexion refusée (max %d clients)", cfg.MAX_WS_CLIENTS)
                 return
+            outq = _ClientOutbox(self.WS_OUT_QUEUE)
+            outq.reply(hello)
+            self._ws_outq[ws] = outq
             self._ws_clients.add(ws)
-
-        # Envoi état initial à la connexion
-        await self._send_json(ws, {
-            "type":    "hello",
-            "version": "SIANA-2026",
-            "state":   self._build_telemetry(),
-        })
+            if binary:
+                self._ws_binary.add(ws)
+        writer = asyncio.ensure_future(self._ws_writer(ws, outq))
+        # Émission en échec → fermeture : la boucle de réception se termine
+        # et le créneau client est libéré
+        writer.add_done_callback(
+            lambda t: t.cancelled() or asyncio.ensure_future(ws.close()))
 
         try:
             async for raw in ws:
                 self._safety.heartbeat()
                 try:
-                    cmd = json.loads(raw)
+                    cmd = _loads(raw)
+                    if cmd.get("action") == "ping":
+                        # Chemin rapide sonde de vie : état inchangé, pas de diffusion
+                        await self._send_json(ws, {
+                            "type": "pong", "ok": True, "msg": "pong", "ts": time.time(),
+                        })
+                        continue
                     result = await self._nav.handle_command(cmd)
                     # Réponse directe au client qui a envoyé la commande
                     await self._send_json(ws, {"type": "cmd_ack", **result})
@@ -113,13 +313,30 @@ class RobotServer:
         except Exception:
             pass
         finally:
+            writer.cancel()
             async with self._ws_lock:
                 self._ws_clients.discard(ws)
+                self._ws_binary.discard(ws)
+                self._ws_outq.pop(ws, None)
             logger.info("WS déconnexion : %s", addr)
 
+    async def _ws_writer(self, ws, outq: _ClientOutbox):
+        """Tâche d'émission d'un client : seul ce client attend sa connexion lente."""
+        while True:
+            msg = await outq.get()
+            try:
+                await ws.send(msg)
+            except Exception:
+                return   # connexion fermée : _ws_handler fait le ménage
+
     async def _send_json(self, ws, data: dict):
+        outq = self._ws_outq.get(ws)
+        if outq is not None:
+            # Réponse directe : jamais écartée, émise avant les diffusions
+            outq.reply(_dumps(data))
+            return
         try:
-            await ws.send(json.dumps(data, default=str))
+            await ws.send(_dumps(data))
         except Exception:
             pass
 
@@ -127,42 +344,61 @@ class RobotServer:
         """Diffuse un message JSON à tous les clients WebSocket connectés."""
         if not self._ws_clients:
             return
-        msg = json.dumps(data, default=str)
-        dead = set()
         async with self._ws_lock:
             clients = set(self._ws_clients)
+        await self._send_many(clients, _dumps(data))
+
+    async def _broadcast_telemetry(self, batch: list):
+        """Diffuse un lot de télémétrie (JSON ou binaire selon le client)."""
+        if not self._ws_clients:
+            return
+        async with self._ws_lock:
+            clients = set(self._ws_clients)
+            binary  = clients & self._ws_binary
+        text = clients - binary
+        if text:
+            await self._send_many(text, _dumps({"type": "telemetry_batch", "items": batch}))
+        if binary:
+            await self._send_many(binary, b"".join(_pack_telemetry(s) for s in batch))
+
+    async def _send_many(self, clients, msg):
+        # Dépôt dans la file de chaque client, sans attendre le réseau ;
+        # client lent → la diffusion la plus ancienne est écartée
         for ws in clients:
-            try:
-                await ws.send(msg)
-            except Exception:
-                dead.add(ws)
-        if dead:
-            async with self._ws_lock:
-                self._ws_clients -= dead
+            outq = self._ws_outq.get(ws)
+            if outq is not None:
+                outq.push(msg)
 
     # ─── Boucle télémétrie 5 Hz ────────────────────────────────────────────────
 
     async def _telemetry_loop(self):
-        import config as cfg
+        cfg = self._cfg
         interval = cfg.TELEMETRY_INTERVAL
+        loop     = asyncio.get_running_loop()
+        t_next   = loop.time()
         while True:
             try:
                 telemetry = self._build_telemetry()
-                await self._broadcast({
-                    "type":      "telemetry",
+                self._telem_cache = (time.monotonic(), telemetry)
+                # Échantillon mis en lot — envoyé par TelemetryBatcher.run()
+                self._telemetry_batcher.put({
                     "timestamp": time.time(),
                     "data":      telemetry,
                 })
                 # Mise à jour overlay caméra
+                inspecting = self._nav._inspecting
                 self._camera.update_overlay(
                     telemetry["motors"]["distance_m"],
-                    "INSP" if self._nav._inspecting else "IDLE"
+                    "INSP" if inspecting else "IDLE",
+                    inspecting,
                 )
                 # Surveillance limites fosse
                 self._safety.check_fosse_limits(telemetry["motors"]["distance_m"])
             except Exception as e:
                 logger.debug("Erreur télémétrie : %s", e)
-            await asyncio.sleep(interval)
+            # Échéance fixe (pas de dérive) ; après un dépassement, on repart de maintenant
+            t_next = max(t_next + interval, loop.time())
+            await asyncio.sleep(t_next - loop.time())
 
     def _build_telemetry(self) -> dict:
         return {
@@ -173,32 +409,42 @@ class RobotServer:
             "leds":    self._leds.get_telemetry(),
         }
 
+    def _latest_telemetry(self) -> dict:
+        """Télémétrie de la boucle 5 Hz si assez récente, sinon reconstruite."""
+        ts, telemetry = self._telem_cache
+        if time.monotonic() - ts < self.TELEMETRY_CACHE_S:
+            return telemetry
+        return self._build_telemetry()
+
     # ═══════════════════════════════════════════════════════════════════════════
     # HTTP REST + MJPEG (aiohttp)
     # ═══════════════════════════════════════════════════════════════════════════
 
     async def _http_status(self, request):
-        return web.json_response(self._build_telemetry())
+        return web.json_response(self._latest_telemetry(), dumps=_dumps)
 
     async def _http_command(self, request):
         try:
-            cmd = await request.json()
+            cmd = await request.json(loads=_loads)
         except Exception:
-            return web.json_response({"ok": False, "msg": "Corps JSON invalide"}, status=400)
+            return web.json_response({"ok": False, "msg": "Corps JSON invalide"}, status=400, dumps=_dumps)
         self._safety.heartbeat()
         result = await self._nav.handle_command(cmd)
-        return web.json_response(result)
+        return web.json_response(result, dumps=_dumps)
 
     async def _http_estop(self, request):
         await self._nav.handle_command({"action": "estop"})
-        return web.json_response({"ok": True, "msg": "ARRÊT D'URGENCE activé"})
+        return web.json_response({"ok": True, "msg": "ARRÊT D'URGENCE activé"}, dumps=_dumps)
 
     async def _http_estop_release(self, request):
         await self._nav.handle_command({"action": "estop_release"})
-        return web.json_response({"ok": True, "msg": "E-STOP relâché"})
+        return web.json_response({"ok": True, "msg": "E-STOP relâché"}, dumps=_dumps)
 
     async def _http_snapshot(self, request):
-        jpeg = self._camera.capture_snapshot()
+        # Sans client du flux, l'image est encodée à la demande : hors boucle
+        jpeg = await asyncio.get_running_loop().run_in_executor(
+            None, self._camera.capture_snapshot
+        )
         if jpeg is None:
             return web.Response(status=503, text="Caméra non disponible")
         return web.Response(body=jpeg, content_type="image/jpeg")
@@ -211,40 +457,69 @@ class RobotServer:
             "Pragma":        "no-cache",
         })
         await response.prepare(request)
+        self._stream_viewers += 1
         try:
-            import config as cfg
-            while True:
-                jpeg = self._camera.get_latest_jpeg()
-                if jpeg:
-                    header = (
-                        b"--frame\r\n"
-                        b"Content-Type: image/jpeg\r\n"
-                        b"Content-Length: " + str(len(jpeg)).encode() + b"\r\n\r\n"
-                    )
-                    await response.write(header + jpeg + b"\r\n")
-                await asyncio.sleep(1.0 / cfg.CAMERA_FRAMERATE)
+            last_seq = -1
+            cam = self._camera
+            with cam.consumer():   # encodage JPEG actif tant que le client regarde
+                while True:
+                    # Future saisie avant la lecture : aucune image ne peut
+                    # être publiée entre les deux sans la résoudre
+                    next_frame = self._frame_fut
+                    # Image brute de la cadence réduite (avant consumer()) :
+                    # pas d'encodage sur la boucle, on attend celle du thread encodeur
+                    seq, header, jpeg = cam.get_latest_part(encode=False)
+                    if jpeg and seq != last_seq:
+                        last_seq = seq
+                        await response.write(header)
+                        await response.write(jpeg)   # JPEG écrit tel quel, sans copie
+                        await response.write(cam.MJPEG_PART_END)
+                    try:
+                        await asyncio.wait_for(asyncio.shield(next_frame), timeout=1.0)
+                    except asyncio.TimeoutError:
+                        pass   # caméra muette : on revérifie
         except (ConnectionResetError, asyncio.CancelledError):
             pass
+        finally:
+            self._stream_viewers -= 1
         return response
 
+    def _on_camera_frame(self):
+        """Thread caméra : réveille les flux MJPEG (seulement s'il y a des clients)."""
+        if self._stream_viewers:
+            self._loop.call_soon_threadsafe(self._resolve_frame_fut)
+
+    def _resolve_frame_fut(self):
+        fut, self._frame_fut = self._frame_fut, self._loop.create_future()
+        fut.set_result(None)
+
     async def _http_ping(self, request):
-        return web.json_response({"ok": True, "msg": "pong", "ts": time.time()})
+        return web.json_response({"ok": True, "msg": "pong", "ts": time.time()}, dumps=_dumps)
 
     # ═══════════════════════════════════════════════════════════════════════════
     # Démarrage du serveur
     # ═══════════════════════════════════════════════════════════════════════════
 
     async def start(self):
-        import config as cfg
+        cfg = self._cfg
+
+        self._loop      = asyncio.get_running_loop()
+        self._frame_fut = self._loop.create_future()
+        self._camera.add_frame_listener(self._on_camera_frame)
 
         # ── WebSocket ──────────────────────────────────────────────────────────
         if _WS_AVAILABLE:
-            ws_server = await websockets.serve(
+            ws_sock = _make_listen_socket(
+                cfg.SERVER_HOST, cfg.SERVER_PORT, cfg.TCP_SOCKET_BUFFER_BYTES
+            )
+            ws_server = self._ws_server = await websockets.serve(
                 self._ws_handler,
-                cfg.SERVER_HOST,
-                cfg.SERVER_PORT,
+                sock=ws_sock,
                 ping_interval=cfg.WS_PING_INTERVAL,
                 ping_timeout=cfg.WS_PING_INTERVAL * 2,
+                compression=None,     # petits messages JSON : deflate = CPU perdu (A57)
+                max_size=2 ** 16,     # commandes entrantes : quelques centaines d'octets
+                max_queue=8,          # file de réception bornée par client
             )
             logger.info(
                 "WebSocket démarré : ws://%s:%d",
@@ -265,9 +540,12 @@ class RobotServer:
             app.router.add_get( "/api/snapshot",        self._http_snapshot)
             app.router.add_get( "/stream",              self._http_stream)
 
-            runner = web.AppRunner(app)
+            runner = self._http_runner = web.AppRunner(app)
             await runner.setup()
-            site = web.TCPSite(runner, cfg.SERVER_HOST, cfg.HTTP_PORT)
+            http_sock = _make_listen_socket(
+                cfg.SERVER_HOST, cfg.HTTP_PORT, cfg.TCP_SOCKET_BUFFER_BYTES
+            )
+            site = web.SockSite(runner, http_sock)
             await site.start()
             logger.info(
                 "HTTP démarré : http://%s:%d  (stream: /stream  REST: /api/*)",
@@ -277,7 +555,10 @@ class RobotServer:
             logger.error("HTTP NON démarré — aiohttp manquant")
 
         # ── Boucle télémétrie ──────────────────────────────────────────────────
-        asyncio.ensure_future(self._telemetry_loop())
+        self._tasks = [
+            asyncio.create_task(self._telemetry_loop(), name="telemetry"),
+            asyncio.create_task(self._telemetry_batcher.run(), name="telemetry-batcher"),
+        ]
 
         logger.info("Serveur SIANA opérationnel")
 
@@ -287,3 +568,21 @@ class RobotServer:
                 await asyncio.Future()   # tourne indéfiniment
         else:
             await asyncio.Future()
+
+    async def stop(self):
+        """
+        Arrêt propre : annule et attend les tâches de fond (aucune boucle
+        télémétrie ne survit aux composants), puis ferme WebSocket et HTTP.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._ws_server is not None:
+            self._ws_server.close()
+            await self._ws_server.wait_closed()
+            self._ws_server = None
+        if self._http_runner is not None:
+            await self._http_runner.cleanup()
+            self._http_runner = None
+        logger.info("Serveur SIANA arrêté")